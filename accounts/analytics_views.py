@@ -4,7 +4,7 @@ from django.http import HttpResponseForbidden
 from django.db.models import Count, Avg, F, ExpressionWrapper, DurationField, Q
 from django.utils import timezone
 from datetime import timedelta
-from mas_sheets.models import MAS, MASActivityLog
+from mas_sheets.models import MAS, MASActivityLog, MASChain
 from projects.models import Project
 from services.models import Item, Service
 from accounts.models import CustomUser
@@ -126,8 +126,8 @@ def analytics_dashboard(request):
     
     # 5. Revision and rejection counts
     # Count how many MAS have revisions (parent_mas is not None means it's a revision)
-    mas_with_revisions = all_mas.exclude(parent_mas__isnull=True).values('mas_id').distinct().count()
-    total_revisions = all_mas.exclude(parent_mas__isnull=True).count()
+    mas_with_revisions = MASChain.objects.filter(revision_count__gt=1).count()
+    total_revisions = all_mas.filter(revision__gt=0).count()
     
     # 6. Average approval time (from creation to approval)
     approved_mas_with_dates = MAS.objects.filter(
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
 
 from crispy_forms.helper import FormHelper
 
@@ -22,6 +23,15 @@ class CustomUserCreationForm(UserCreationForm):
         model = get_user_model()
         fields = ['username', 'email', 'password1', 'password2', 'department', 'other_department', 'user_type']
 
+    def clean_username(self):
+        # Same lookup as the unique_username_ci constraint, so it uses its index and the
+        # error is shown on the username field
+        username = self.cleaned_data.get('username')
+        users = self._meta.model.objects.alias(username_lower=Lower('username'))
+        if username and users.filter(username_lower=username.lower()).exists():
+            raise forms.ValidationError('A user with that username already exists.', code='unique')
+        return username
+
     def clean(self):
         cleaned_data = super().clean()
         department = cleaned_data.get('department')
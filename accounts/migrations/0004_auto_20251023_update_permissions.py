@@ -4,7 +4,7 @@ from django.db import migrations
 from django.contrib.auth import get_user_model
 
 def update_user_permissions(apps, schema_editor):
-    User = get_user_model()
+    User = apps.get_model('accounts', 'CustomUser')
     for user in User.objects.all():
         # Set staff status based on level
         if user.level in ['Admin', 'Approver']:
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:45
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_remove_customuser_level_customuser_user_type"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="customuser",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("username"),
+                name="unique_username_ci",
+                violation_error_message="A user with that username already exists.",
+            ),
+        ),
+    ]
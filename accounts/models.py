@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 class CustomUser(AbstractUser):
     DEPARTMENT_CHOICES = [
@@ -22,6 +23,16 @@ class CustomUser(AbstractUser):
     other_department = models.CharField(max_length=100, blank=True, null=True)
     user_type = models.CharField(max_length=50, choices=USER_TYPE_CHOICES, default='Vendor')
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Usernames are unique regardless of case; also indexes case-insensitive lookups
+            models.UniqueConstraint(
+                Lower('username'),
+                name='unique_username_ci',
+                violation_error_message='A user with that username already exists.',
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         # Clear other_department if not 'Other'
         if self.department != 'Other':
@@ -1,3 +1,85 @@
+from django.db import connection
+from django.db.models.functions import Lower
 from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from projects.models import Project, Building, ProjectVendor
+from services.models import Service, Item
+from mas_sheets.models import MAS
+from .forms import CustomUserCreationForm
+from .views import _vendor_mas_summary
 
-# Create your tests here.
+User = get_user_model()
+
+
+class VendorDashboardSummaryTests(TestCase):
+    def setUp(self):
+        self.vendor = User.objects.create_user(username='vendor', password='pass', user_type='Vendor')
+        self.project = Project.objects.create(name='Tower', project_number='P100')
+        self.building = Building.objects.create(project=self.project, name='B1')
+        self.service = Service.objects.create(name='HVAC')
+        self.items = [Item.objects.create(service=self.service, name=f'Item {i}') for i in range(3)]
+        pv = ProjectVendor.objects.create(project=self.project, user=self.vendor, building=self.building)
+        pv.services.add(self.service)
+
+        for item, status in zip(self.items[:2], ['approved', 'pending_review']):
+            MAS.objects.create(project=self.project, building=self.building, service=self.service, item=item,
+                               make='Acme', attachment='mas_files/test.pdf', creator=self.vendor, status=status)
+
+    def test_summary_uses_two_grouped_queries(self):
+        with self.assertNumQueries(2):
+            summary = _vendor_mas_summary(self.vendor)
+
+        counts = {row['status']: row['count'] for row in summary['status_summary']}
+        self.assertEqual(counts['approved'], 1)
+        self.assertEqual(counts['pending_review'], 1)
+        self.assertEqual(summary['project_summary'][0]['total'], 2)
+        self.assertEqual(summary['items_pending'], [{
+            'project': 'Tower', 'service': 'HVAC', 'total': 3, 'submitted': 2, 'remaining': 1,
+        }])
+
+    def test_items_pending_counts_only_the_vendors_latest_mas_in_the_project(self):
+        mas = MAS.objects.get(item=self.items[0])
+        mas.is_latest = False
+        mas.save()
+        other_vendor = User.objects.create_user(username='other', password='pass', user_type='Vendor')
+        other_project = Project.objects.create(name='Annex', project_number='P200')
+        other_building = Building.objects.create(project=other_project, name='B1')
+        for creator, project, building in [(other_vendor, self.project, self.building),
+                                           (self.vendor, other_project, other_building)]:
+            MAS.objects.create(project=project, building=building, service=self.service, item=self.items[2],
+                               make='Acme', attachment='mas_files/test.pdf', creator=creator)
+
+        self.assertEqual(_vendor_mas_summary(self.vendor)['items_pending'], [{
+            'project': 'Tower', 'service': 'HVAC', 'total': 3, 'submitted': 1, 'remaining': 2,
+        }])
+
+    def test_dashboard_renders_summary(self):
+        self.client.force_login(self.vendor)
+        resp = self.client.get(reverse('accounts:dashboard'))
+        self.assertContains(resp, 'Items Not Yet Submitted')
+
+
+class CaseInsensitiveUsernameTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='Vendor', password='pass')
+
+    def test_check_username_ignores_case(self):
+        resp = self.client.get(reverse('accounts:check_username'), {'username': 'vENDOR'})
+        self.assertFalse(resp.json()['available'])
+
+    def test_signup_reports_case_duplicate_on_username(self):
+        form = CustomUserCreationForm(data={
+            'username': 'VENDOR', 'email': 'v@example.com', 'password1': 'Sturdy-pass-123',
+            'password2': 'Sturdy-pass-123', 'department': 'Other', 'other_department': 'QA',
+            'user_type': 'Vendor',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['username'], ['A user with that username already exists.'])
+        self.assertNotIn('__all__', form.errors)
+
+    def test_lookup_uses_functional_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('plan assertions are SQLite-specific')
+        plan = User.objects.alias(username_lower=Lower('username')).filter(username_lower='vendor').explain()
+        self.assertIn('unique_username_ci', plan)
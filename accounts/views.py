@@ -5,6 +5,7 @@ from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from django.http import JsonResponse, HttpResponseForbidden
 from django.contrib import messages
+from django.db.models.functions import Lower
 from .forms import CustomUserCreationForm
 from .models import CustomUser
 
@@ -18,6 +19,68 @@ class SignUpView(CreateView):
         login(self.request, self.object)
         return response
 
+def _vendor_mas_summary(user):
+    """
+    Counts for the vendor dashboard: latest MAS per status and per project (one grouped query),
+    and items not yet submitted per assigned project/service (one grouped query over the
+    assignments, merged with the first one in Python).
+    """
+    from django.db.models import Count
+    from mas_sheets.models import MAS
+    from projects.models import ProjectVendor
+
+    status_labels = dict(MAS.STATUS_CHOICES)
+    status_counts = {status: 0 for status in status_labels}
+    projects = {}
+    # A vendor has at most one latest MAS per project and item, so each count is also the
+    # number of submitted items of that service
+    submitted = {}
+    grouped = (
+        MAS.objects.filter(creator=user, is_latest=True)
+        .values('project_id', 'project__name', 'status', 'item__service_id')
+        .annotate(count=Count('id'))
+        .order_by('project__name')
+    )
+    for row in grouped:
+        key = (row['project_id'], row['item__service_id'])
+        submitted[key] = submitted.get(key, 0) + row['count']
+        status_counts[row['status']] = status_counts.get(row['status'], 0) + row['count']
+        project = projects.setdefault(row['project_id'], {
+            'name': row['project__name'],
+            'total': 0,
+            'counts': {status: 0 for status in status_labels},
+        })
+        project['counts'][row['status']] += row['count']
+        project['total'] += row['count']
+
+    # Items of each assigned service, and how many of them already have a latest MAS in that project
+    assigned_services = (
+        ProjectVendor.services.through.objects.filter(projectvendor__user=user)
+        .values('projectvendor__project_id', 'projectvendor__project__name', 'service_id',
+                'service__name', 'service__other_name')
+        .annotate(total_items=Count('service__items'))
+        .order_by('projectvendor__project__name', 'service__name')
+    )
+    items_pending = []
+    for row in assigned_services:
+        submitted_items = submitted.get((row['projectvendor__project_id'], row['service_id']), 0)
+        items_pending.append({
+            'project': row['projectvendor__project__name'],
+            'service': row['service__other_name'] if row['service__name'] == 'Other' else row['service__name'],
+            'total': row['total_items'],
+            'submitted': submitted_items,
+            'remaining': row['total_items'] - submitted_items,
+        })
+
+    return {
+        'status_summary': [
+            {'status': status, 'label': status_labels[status], 'count': count}
+            for status, count in status_counts.items()
+        ],
+        'project_summary': list(projects.values()),
+        'items_pending': items_pending,
+    }
+
 @login_required
 def dashboard(request):
     context = {'user': request.user}
@@ -35,8 +98,10 @@ def dashboard(request):
         context['mas_list'] = (
             MAS.objects.filter(creator=request.user, is_latest=True)
             .filter(pending_q)
+            .select_related('project', 'building', 'service', 'item')
             .order_by('-updated_at')[:10]
         )
+        context.update(_vendor_mas_summary(request.user))
     
     return render(request, 'accounts/dashboard.html', context)
 
@@ -55,7 +120,8 @@ def check_username(request):
             'message': 'Username cannot be more than 150 characters long'
         }
     else:
-        is_taken = User.objects.filter(username__iexact=username).exists()
+        # Compare on LOWER(username) so the unique_username_ci index is used
+        is_taken = User.objects.alias(username_lower=Lower('username')).filter(username_lower=username.lower()).exists()
         response = {
             'available': not is_taken,
             'message': 'This username is already taken' if is_taken else 'Username is available'
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import Event, ProjectionCheckpoint
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'timestamp', 'code', 'subject_id', 'actor', 'project', 'building']
+    list_filter = ['code']
+    search_fields = ['subject_id']
+    readonly_fields = ['code', 'timestamp', 'actor', 'project', 'building', 'subject_id', 'payload']
+    ordering = ['-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProjectionCheckpoint)
+class ProjectionCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_event_id', 'updated_at']
+    readonly_fields = ['updated_at']
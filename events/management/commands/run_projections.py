@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.projections import get_projections, run_projection
+
+
+class Command(BaseCommand):
+    help = 'Apply new events to projections (derived tables), or rebuild them from the first event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Projections to run (default: all)')
+        parser.add_argument('--rebuild', action='store_true', help='Reset and replay from the first event')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--list', action='store_true', help='List the registered projections')
+
+    def handle(self, *args, **options):
+        projections = get_projections()
+        if options['list']:
+            for name in sorted(projections):
+                self.stdout.write(name)
+            return
+
+        names = options['names'] or sorted(projections)
+        unknown = set(names) - set(projections)
+        if unknown:
+            raise CommandError(f"Unknown projection(s): {', '.join(sorted(unknown))}")
+
+        for name in names:
+            def progress(applied, last_id, name=name):
+                self.stdout.write(f'{name}: {applied} events applied (up to #{last_id})')
+
+            applied = run_projection(projections[name](), rebuild=options['rebuild'],
+                                     batch_size=options['batch_size'], progress=progress)
+            self.stdout.write(self.style.SUCCESS(f'{name}: done, {applied} events applied.'))
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("projects", "0008_mas_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectionCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("last_event_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Event",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (100, "MAS created"),
+                            (101, "MAS edited"),
+                            (102, "MAS submitted for review"),
+                            (103, "MAS reviewed"),
+                            (104, "MAS submitted for approval"),
+                            (105, "MAS approved"),
+                            (106, "MAS rejected"),
+                            (107, "MAS revision requested"),
+                            (108, "MAS revision submitted"),
+                            (109, "MAS fast-tracked"),
+                            (200, "Service created"),
+                            (201, "Service updated"),
+                            (202, "Service deleted"),
+                            (210, "Item created"),
+                            (211, "Item updated"),
+                            (212, "Item deleted"),
+                            (220, "Item make created"),
+                            (221, "Item make updated"),
+                            (222, "Item make deleted"),
+                        ]
+                    ),
+                ),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                ("subject_id", models.PositiveBigIntegerField()),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "building",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="projects.building",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["subject_id", "code"], name="event_subject_code_idx"
+                    )
+                ],
+            },
+        ),
+    ]
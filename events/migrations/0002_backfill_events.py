@@ -0,0 +1,114 @@
+import heapq
+
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+MAS_ACTION_CODES = {
+    "created": 100,
+    "edited": 101,
+    "submitted_review": 102,
+    "reviewed": 103,
+    "submitted_approval": 104,
+    "approved": 105,
+    "rejected": 106,
+    "revision_requested": 107,
+    "revision_submitted": 108,
+    "fast_tracked": 109,
+}
+SERVICE_LOG_CODES = {
+    ("Service", "CREATE"): 200,
+    ("Service", "UPDATE"): 201,
+    ("Service", "DELETE"): 202,
+    ("Item", "CREATE"): 210,
+    ("Item", "UPDATE"): 211,
+    ("Item", "DELETE"): 212,
+    ("ItemMake", "CREATE"): 220,
+    ("ItemMake", "UPDATE"): 221,
+    ("ItemMake", "DELETE"): 222,
+}
+
+
+def backfill_events(apps, schema_editor):
+    """Replay the existing MAS and service logs into the event store, oldest first"""
+    Event = apps.get_model("events", "Event")
+    MASActivityLog = apps.get_model("mas_sheets", "MASActivityLog")
+    ServiceLog = apps.get_model("services", "ServiceLog")
+
+    MAS = apps.get_model("mas_sheets", "MAS")
+
+    def mas_events():
+        # Whether the MAS was still its chain's latest revision when the log was written
+        superseded = MAS.objects.filter(
+            chain_id=OuterRef("mas__chain_id"),
+            revision__gt=OuterRef("mas__revision"),
+            created_at__lte=OuterRef("timestamp"),
+        )
+        logs = (
+            MASActivityLog.objects.select_related("mas")
+            .annotate(superseded=Exists(superseded))
+            .order_by("timestamp", "id")
+            .iterator(chunk_size=2000)
+        )
+        for log in logs:
+            mas = log.mas
+            # chain, revision and parent belong to the MAS row and never change once it
+            # is created; status comes from the log's snapshot and is_latest from the
+            # revisions that existed at the time, not from the row's current state
+            yield log.timestamp, Event(
+                code=MAS_ACTION_CODES.get(log.action, 101),
+                timestamp=log.timestamp,
+                actor_id=log.user_id,
+                project_id=mas.project_id,
+                building_id=mas.building_id,
+                subject_id=mas.pk,
+                payload={
+                    "mas_id": mas.mas_id,
+                    "chain_id": mas.chain_id,
+                    "revision": mas.revision,
+                    "parent_mas_id": mas.parent_mas_id,
+                    "status": log.status,
+                    "is_latest": not log.superseded,
+                    "service_id": mas.service_id,
+                    "item_id": mas.item_id,
+                    "creator_id": mas.creator_id,
+                    "make": log.make,
+                    "details": log.details,
+                },
+            )
+
+    def service_events():
+        for log in ServiceLog.objects.order_by("timestamp", "id").iterator(
+            chunk_size=2000
+        ):
+            code = SERVICE_LOG_CODES.get((log.content_type, log.action))
+            if code:
+                yield log.timestamp, Event(
+                    code=code,
+                    timestamp=log.timestamp,
+                    actor_id=log.user_id,
+                    subject_id=log.object_id,
+                    payload={"username": log.username, "details": log.details},
+                )
+
+    batch = []
+    for _, event in heapq.merge(
+        mas_events(), service_events(), key=lambda pair: pair[0]
+    ):
+        batch.append(event)
+        if len(batch) >= 1000:
+            Event.objects.bulk_create(batch)
+            batch = []
+    Event.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        ("mas_sheets", "0016_mas_search"),
+        ("services", "0004_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
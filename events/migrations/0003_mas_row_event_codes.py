@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_backfill_events"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="event",
+            name="code",
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (100, "MAS created"),
+                    (101, "MAS edited"),
+                    (102, "MAS submitted for review"),
+                    (103, "MAS reviewed"),
+                    (104, "MAS submitted for approval"),
+                    (105, "MAS approved"),
+                    (106, "MAS rejected"),
+                    (107, "MAS revision requested"),
+                    (108, "MAS revision submitted"),
+                    (109, "MAS fast-tracked"),
+                    (110, "MAS saved"),
+                    (111, "MAS deleted"),
+                    (200, "Service created"),
+                    (201, "Service updated"),
+                    (202, "Service deleted"),
+                    (210, "Item created"),
+                    (211, "Item updated"),
+                    (212, "Item deleted"),
+                    (220, "Item make created"),
+                    (221, "Item make updated"),
+                    (222, "Item make deleted"),
+                ]
+            ),
+        ),
+    ]
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class EventCode(models.IntegerChoices):
+    """
+    Typed event codes. Values are stored, so never renumber or reuse one; add new codes instead.
+    """
+    # MAS workflow (MASActivityLog actions)
+    MAS_CREATED = 100, 'MAS created'
+    MAS_EDITED = 101, 'MAS edited'
+    MAS_SUBMITTED_REVIEW = 102, 'MAS submitted for review'
+    MAS_REVIEWED = 103, 'MAS reviewed'
+    MAS_SUBMITTED_APPROVAL = 104, 'MAS submitted for approval'
+    MAS_APPROVED = 105, 'MAS approved'
+    MAS_REJECTED = 106, 'MAS rejected'
+    MAS_REVISION_REQUESTED = 107, 'MAS revision requested'
+    MAS_REVISION_SUBMITTED = 108, 'MAS revision submitted'
+    MAS_FAST_TRACKED = 109, 'MAS fast-tracked'
+    # MAS row changes (MAS.save() and MAS.delete()), whatever caused them
+    MAS_SAVED = 110, 'MAS saved'
+    MAS_DELETED = 111, 'MAS deleted'
+    # Service catalog (ServiceLog actions per content type)
+    SERVICE_CREATED = 200, 'Service created'
+    SERVICE_UPDATED = 201, 'Service updated'
+    SERVICE_DELETED = 202, 'Service deleted'
+    ITEM_CREATED = 210, 'Item created'
+    ITEM_UPDATED = 211, 'Item updated'
+    ITEM_DELETED = 212, 'Item deleted'
+    ITEM_MAKE_CREATED = 220, 'Item make created'
+    ITEM_MAKE_UPDATED = 221, 'Item make updated'
+    ITEM_MAKE_DELETED = 222, 'Item make deleted'
+
+
+# MASActivityLog.action -> event code
+MAS_ACTION_CODES = {
+    'created': EventCode.MAS_CREATED,
+    'edited': EventCode.MAS_EDITED,
+    'submitted_review': EventCode.MAS_SUBMITTED_REVIEW,
+    'reviewed': EventCode.MAS_REVIEWED,
+    'submitted_approval': EventCode.MAS_SUBMITTED_APPROVAL,
+    'approved': EventCode.MAS_APPROVED,
+    'rejected': EventCode.MAS_REJECTED,
+    'revision_requested': EventCode.MAS_REVISION_REQUESTED,
+    'revision_submitted': EventCode.MAS_REVISION_SUBMITTED,
+    'fast_tracked': EventCode.MAS_FAST_TRACKED,
+}
+MAS_EVENT_CODES = list(MAS_ACTION_CODES.values()) + [EventCode.MAS_SAVED, EventCode.MAS_DELETED]
+
+# (ServiceLog.content_type, ServiceLog.action) -> event code
+SERVICE_LOG_CODES = {
+    ('Service', 'CREATE'): EventCode.SERVICE_CREATED,
+    ('Service', 'UPDATE'): EventCode.SERVICE_UPDATED,
+    ('Service', 'DELETE'): EventCode.SERVICE_DELETED,
+    ('Item', 'CREATE'): EventCode.ITEM_CREATED,
+    ('Item', 'UPDATE'): EventCode.ITEM_UPDATED,
+    ('Item', 'DELETE'): EventCode.ITEM_DELETED,
+    ('ItemMake', 'CREATE'): EventCode.ITEM_MAKE_CREATED,
+    ('ItemMake', 'UPDATE'): EventCode.ITEM_MAKE_UPDATED,
+    ('ItemMake', 'DELETE'): EventCode.ITEM_MAKE_DELETED,
+}
+
+
+def _reference(to):
+    """Integer reference that outlives the referenced row (no DB constraint, never cascades)"""
+    return models.ForeignKey(to, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+                             related_name='+')
+
+
+class Event(models.Model):
+    """
+    Append-only domain event. Ids give the global order projections replay in.
+    `subject_id` is the primary key of the entity the code refers to (MAS, Service, Item or ItemMake);
+    `payload` holds the code-specific data.
+    """
+    code = models.PositiveSmallIntegerField(choices=EventCode.choices)
+    timestamp = models.DateTimeField(default=timezone.now)
+    actor = _reference(settings.AUTH_USER_MODEL)
+    project = _reference('projects.Project')
+    building = _reference('projects.Building')
+    subject_id = models.PositiveBigIntegerField()
+    payload = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # All events of one entity
+            models.Index(fields=['subject_id', 'code'], name='event_subject_code_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_code_display()} ({self.subject_id})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Events are append-only and cannot be changed.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Events are append-only and cannot be deleted.')
+
+
+class ProjectionCheckpoint(models.Model):
+    """Id of the last event a projection has applied"""
+    name = models.CharField(max_length=100, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
@@ -0,0 +1,80 @@
+"""
+Projections: derived tables rebuilt from the event stream.
+
+A projection declares the event codes it consumes and applies them in batches, in event id
+order. After each batch its checkpoint is advanced in the same transaction, so a run can stop
+at any point and resume later, and a read model can be built offline by replaying from zero.
+
+A projection that folds event payloads clears its tables and replays every event on a
+rebuild. One that only uses events to find which rows to refresh from live tables (a search
+index, say) sets `replay = False`: its rebuild recomputes everything from those tables and
+moves the checkpoint to the latest event in the same transaction.
+"""
+from django.db import transaction
+
+from .models import Event, ProjectionCheckpoint
+
+_registry = {}
+
+
+def register(projection_class):
+    """Class decorator adding a projection to the registry under its `name`"""
+    _registry[projection_class.name] = projection_class
+    return projection_class
+
+
+def get_projections():
+    return dict(_registry)
+
+
+class Projection:
+    """Base class for projections; subclasses set `name` and `codes` and implement apply()"""
+    name = ''
+    # Event codes consumed, None for all
+    codes = None
+    # Whether a rebuild replays the events from the first one, see run_projection()
+    replay = True
+
+    def reset(self):
+        """
+        Prepare for a rebuild: clear the derived data before a replay, or, with `replay`
+        off, recompute all of it from the live tables
+        """
+
+    def apply(self, events):
+        """Apply a batch of events (a list, in id order) to the derived data"""
+        raise NotImplementedError
+
+
+def run_projection(projection, rebuild=False, batch_size=1000, progress=None):
+    """
+    Stream events newer than the projection's checkpoint through it in batches of `batch_size`.
+    With `rebuild`, the derived data is reset and replayed from the first event, or for projections
+    with `replay` off, recomputed by reset() and brought up to the latest event.
+    `progress` is called with (events applied so far, last event id) after each batch.
+    Returns the number of events applied.
+    """
+    checkpoint, _ = ProjectionCheckpoint.objects.get_or_create(name=projection.name)
+    events = Event.objects.order_by('id')
+    if projection.codes is not None:
+        events = events.filter(code__in=projection.codes)
+
+    if rebuild:
+        with transaction.atomic():
+            projection.reset()
+            checkpoint.last_event_id = 0 if projection.replay else events.values_list('id', flat=True).last() or 0
+            checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+
+    applied = 0
+    while True:
+        batch = list(events.filter(id__gt=checkpoint.last_event_id)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            projection.apply(batch)
+            checkpoint.last_event_id = batch[-1].id
+            checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+        applied += len(batch)
+        if progress:
+            progress(applied, checkpoint.last_event_id)
+    return applied
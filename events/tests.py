@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from mas_sheets.models import (MAS, MAS_STATUS_COUNTERS, MASChain, MASChainState, MASStatusCount,
+                               buffered_activity_logs)
+from mas_sheets.projections import MASChainProjection, MASSearchProjection
+from mas_sheets.search import search_mas
+from projects.models import Building, Project
+from services.models import Item, Service, ServiceLog
+from .models import Event, EventCode, ProjectionCheckpoint
+from .projections import get_projections, run_projection
+
+User = get_user_model()
+
+
+class EventStoreTests(TestCase):
+    def setUp(self):
+        self.vendor = User.objects.create_user(username='vendor', password='pass', user_type='Vendor')
+        self.project = Project.objects.create(name='Tower', project_number='P100')
+        self.building = Building.objects.create(project=self.project, name='B1')
+        self.service = Service.objects.create(name='HVAC')
+        self.item = Item.objects.create(service=self.service, name='Chiller')
+
+    def make_mas(self, **kwargs):
+        mas = MAS.objects.create(project=self.project, building=self.building, service=self.service,
+                                 item=self.item, make='Acme', attachment='mas_files/test.pdf',
+                                 creator=self.vendor, **kwargs)
+        mas.log_activity('created', self.vendor, 'MAS created')
+        return mas
+
+    def test_mas_and_service_logs_append_events(self):
+        mas = self.make_mas()
+        ServiceLog.objects.create(user=self.vendor, username='vendor', action='UPDATE', content_type='Item',
+                                  object_id=self.item.pk, details='Updated item')
+
+        saved_event, mas_event, item_event = Event.objects.order_by('id')
+        self.assertEqual((saved_event.code, saved_event.subject_id), (EventCode.MAS_SAVED, mas.pk))
+        self.assertEqual((mas_event.code, mas_event.subject_id, mas_event.project_id, mas_event.actor_id),
+                         (EventCode.MAS_CREATED, mas.pk, self.project.pk, self.vendor.pk))
+        self.assertEqual(mas_event.payload['status'], 'pending_review')
+        self.assertEqual(mas_event.payload['chain_id'], mas.chain_id)
+        self.assertEqual((item_event.code, item_event.subject_id), (EventCode.ITEM_UPDATED, self.item.pk))
+
+    def test_events_are_append_only(self):
+        self.make_mas()
+        event = Event.objects.get(code=EventCode.MAS_CREATED)
+        with self.assertRaises(ValueError):
+            event.save()
+        with self.assertRaises(ValueError):
+            event.delete()
+
+    def assertFoldMatchesLiveTables(self):
+        """The mas_chains read models agree with MASChain and the project/building counters"""
+        live_chains = {
+            chain.pk: (chain.head_id, chain.status, chain.revision_count)
+            for chain in MASChain.objects.exclude(head=None)
+        }
+        folded_chains = {
+            state.chain_id: (state.head_id, state.status, state.revision_count)
+            for state in MASChainState.objects.all()
+        }
+        self.assertEqual(folded_chains, live_chains)
+        live_counts = {
+            (building.project_id, building.pk, counter): getattr(building, counter)
+            for building in Building.objects.all()
+            for counter in set(MAS_STATUS_COUNTERS.values())
+            if getattr(building, counter)
+        }
+        folded_counts = {
+            (row.project_id, row.building_id, row.counter): row.count
+            for row in MASStatusCount.objects.exclude(count=0)
+        }
+        self.assertEqual(folded_counts, live_counts)
+
+    def test_projection_replays_from_checkpoint(self):
+        self.assertIn('mas_chains', get_projections())
+        self.make_mas()
+        MASChainState.objects.update(status='rejected')
+
+        self.assertEqual(run_projection(MASChainProjection(), rebuild=True), 2)  # saved, created
+        self.assertFoldMatchesLiveTables()
+        self.assertEqual(ProjectionCheckpoint.objects.get(name='mas_chains').last_event_id, Event.objects.last().pk)
+
+        # Nothing new to apply, then only the new events
+        self.assertEqual(run_projection(MASChainProjection()), 0)
+        self.item = Item.objects.create(service=self.service, name='Pump')
+        self.make_mas(status='approved')
+        self.assertEqual(run_projection(MASChainProjection()), 2)
+        self.assertFoldMatchesLiveTables()
+
+    def test_fold_follows_status_changes_revisions_and_deletes(self):
+        mas = self.make_mas()
+        run_projection(MASChainProjection())
+
+        mas.status = 'revision_requested'
+        mas.save()
+        revision = mas.create_revision(
+            MAS(project=self.project, building=self.building, service=self.service, item=self.item,
+                make='Acme', attachment='mas_files/test.pdf', creator=self.vendor),
+            self.vendor,
+        )
+        revision.status = 'approved'
+        revision.save()
+        self.item = Item.objects.create(service=self.service, name='Pump')
+        other = self.make_mas()
+        run_projection(MASChainProjection())
+        self.assertFoldMatchesLiveTables()
+        self.assertEqual(MASChainState.objects.get(pk=mas.chain_id).revision, 1)
+
+        other.delete()
+        run_projection(MASChainProjection())
+        self.assertFoldMatchesLiveTables()
+        self.assertFalse(MASChainState.objects.filter(pk=other.chain_id).exists())
+
+        # Replaying the whole stream from zero gives the same tables
+        self.assertGreater(run_projection(MASChainProjection(), rebuild=True), 0)
+        self.assertFoldMatchesLiveTables()
+
+    def test_buffered_workflow_writes_one_event_per_action(self):
+        mas = self.make_mas()
+        before = Event.objects.count()
+        with transaction.atomic(), buffered_activity_logs():
+            mas.status = 'pending_approval'
+            mas.save()
+            mas.log_activity('reviewed', self.vendor, 'Reviewed')
+        codes = Event.objects.order_by('id').values_list('code', flat=True)[before:]
+        self.assertEqual(list(codes), [EventCode.MAS_REVIEWED])
+
+    def test_search_rebuild_does_not_replay(self):
+        mas = self.make_mas()
+        self.assertEqual(run_projection(MASSearchProjection(), rebuild=True), 0)
+        self.assertEqual(ProjectionCheckpoint.objects.get(name='mas_search').last_event_id, Event.objects.last().pk)
+        self.assertEqual([pk for pk, score in search_mas('Acme')], [mas.pk])
@@ -0,0 +1,84 @@
+"""
+Batched backfills for data migrations and maintenance commands.
+
+Rows are processed in primary-key-ranged chunks, each in its own transaction, so a long
+backfill never holds one huge transaction open. Backfills are resumable: a chunk's work is
+committed before the next one starts, the queryset should exclude rows that are already done
+(e.g. ``filter(username='')``), and ``start_after`` can skip an already processed pk prefix.
+In a migration, set ``atomic = False`` on the Migration so chunks really commit one by one.
+"""
+import sys
+
+from django.db import transaction
+
+
+def pk_chunks(queryset, batch_size=1000, start_after=None):
+    """
+    Yield (chunk queryset, last pk) pairs covering `queryset` in ascending pk ranges of
+    at most `batch_size` rows. Each range is computed only after the previous chunk was
+    consumed, so rows changed by earlier chunks are seen as they are now.
+    """
+    queryset = queryset.order_by('pk')
+    after = start_after
+    while True:
+        remaining = queryset if after is None else queryset.filter(pk__gt=after)
+        # Upper bound of this chunk: the batch_size-th pk, or everything left
+        last = remaining.values_list('pk', flat=True)[batch_size - 1:batch_size].first()
+        if last is None:
+            last = remaining.values_list('pk', flat=True).last()
+            if last is None:
+                return
+        yield remaining.filter(pk__lte=last), last
+        after = last
+
+
+def backfill(queryset, apply, batch_size=1000, start_after=None, progress=None):
+    """
+    Call `apply(chunk)` for each pk-ranged chunk of `queryset`, one transaction per chunk.
+    `apply` returns the number of rows it changed. `progress(done, total, last_pk)` is called
+    after each chunk. Returns the total number of rows changed.
+    """
+    total = queryset.count() if progress else None
+    done = changed = 0
+    for chunk, last_pk in pk_chunks(queryset, batch_size, start_after):
+        with transaction.atomic(using=queryset.db):
+            size = chunk.count() if progress else 0
+            changed += apply(chunk) or 0
+        done += size
+        if progress:
+            progress(done, total, last_pk)
+    return changed
+
+
+def backfill_update(queryset, batch_size=1000, start_after=None, progress=None, **updates):
+    """Apply `updates` (values or expressions, e.g. a Subquery) with one UPDATE per chunk"""
+    return backfill(queryset, lambda chunk: chunk.update(**updates), batch_size, start_after, progress)
+
+
+def backfill_objects(queryset, fields, transform, batch_size=1000, start_after=None, progress=None):
+    """
+    Load each chunk, call `transform(obj)` on every object and bulk_update `fields` on the
+    objects for which it returned True. For changes that cannot be written as one UPDATE.
+    """
+    def apply(chunk):
+        changed = [obj for obj in chunk if transform(obj)]
+        if changed:
+            chunk.model.objects.bulk_update(changed, fields)
+        return len(changed)
+
+    return backfill(queryset, apply, batch_size, start_after, progress)
+
+
+def print_progress(label, stream=None):
+    """Progress callback writing '<label>: done/total (last pk N)' whenever another 10% is reached"""
+    stream = stream or sys.stdout
+    state = {'reported': -1}
+
+    def report(done, total, last_pk):
+        percent = 100 if not total else done * 100 // total
+        if percent // 10 > state['reported'] or done >= total:
+            state['reported'] = percent // 10
+            stream.write(f'\n  {label}: {done}/{total} rows (last pk {last_pk})')
+            stream.flush()
+
+    return report
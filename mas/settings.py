@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     "services",
     "projects",
     "mas_sheets",
+    "events",
 ]
 
 MIDDLEWARE = [
@@ -83,6 +85,26 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Take the write lock when a transaction starts, so concurrent workflow
+            # transactions wait for it instead of failing with "database is locked"
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Each process has its own local-memory cache unless MAS_CACHE_BACKEND and MAS_CACHE_LOCATION
+# name a backend shared by all worker processes, so that invalidations made by one reach
+# the others (history filter options, facet counts, timelines), e.g.
+# django.core.cache.backends.filebased.FileBasedCache with a directory outside the checkout
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("MAS_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("MAS_CACHE_LOCATION", ""),
     }
 }
 
@@ -148,5 +170,10 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Activity logs older than this many days are moved to monthly archive files
+# by the archive_mas_logs command; mas_history reads them back transparently.
+MAS_LOG_ARCHIVE_DIR = BASE_DIR / 'archive' / 'mas_activity'
+MAS_LOG_ARCHIVE_AFTER_DAYS = 365
+
 # Maximum file upload size (5MB)
 MAX_UPLOAD_SIZE = 5242880  # 5MB in bytes
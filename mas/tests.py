@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+from django.test import TestCase
+
+from services.models import ServiceLog
+from .backfill import backfill_update
+
+User = get_user_model()
+
+
+class BackfillTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='pass')
+        self.logs = [
+            ServiceLog.objects.create(user=self.user, action='CREATE', content_type='Service',
+                                      object_id=i, details='x')
+            for i in range(5)
+        ]
+
+    def _backfill(self, **kwargs):
+        return backfill_update(
+            ServiceLog.objects.filter(username__isnull=True, user__isnull=False),
+            username=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('username')[:1]),
+            **kwargs,
+        )
+
+    def test_updates_in_pk_chunks_and_reports_progress(self):
+        calls = []
+        changed = self._backfill(batch_size=2, progress=lambda *args: calls.append(args))
+        self.assertEqual(changed, 5)
+        self.assertEqual([(done, total) for done, total, _ in calls], [(2, 5), (4, 5), (5, 5)])
+        self.assertEqual(calls[-1][2], self.logs[-1].pk)
+        self.assertFalse(ServiceLog.objects.filter(username__isnull=True).exists())
+
+    def test_resumes_after_pk_and_skips_done_rows(self):
+        self._backfill(batch_size=2, start_after=self.logs[2].pk)
+        self.assertEqual(ServiceLog.objects.filter(username='alice').count(), 2)
+        # A second run only touches the rows that are still missing
+        self.assertEqual(self._backfill(batch_size=2), 3)
@@ -1,12 +1,16 @@
 from django.contrib import admin
-from .models import MAS, MASActivityLog
+from .models import MAS, MASActivityLog, MASChain, MASSerialCounter, SavedMASView
 
 @admin.register(MAS)
 class MASAdmin(admin.ModelAdmin):
-    list_display = ['mas_id', 'revision', 'project', 'building', 'service', 'item', 'make', 'status', 'creator', 'created_at']
+    list_display = ['mas_id', 'revision_label', 'project', 'building', 'service', 'item', 'make', 'status', 'creator', 'created_at']
     list_filter = ['status', 'project', 'building', 'service', 'created_at']
     search_fields = ['mas_id', 'make', 'creator__username']
     readonly_fields = ['mas_id', 'serial_number', 'revision', 'created_at', 'updated_at']
+
+    @admin.display(description='Revision', ordering='revision')
+    def revision_label(self, obj):
+        return obj.revision_label
     
 @admin.register(MASActivityLog)
 class MASActivityLogAdmin(admin.ModelAdmin):
@@ -15,3 +19,21 @@ class MASActivityLogAdmin(admin.ModelAdmin):
     search_fields = ['mas__mas_id', 'user__username', 'project_name', 'building_name', 'details']
     readonly_fields = ['mas', 'action', 'user', 'timestamp', 'details', 'project_name', 'building_name', 'service_name', 'item_name', 'make', 'status']
     date_hierarchy = 'timestamp'
+
+
+@admin.register(SavedMASView)
+class SavedMASViewAdmin(admin.ModelAdmin):
+    list_display = ['name', 'user', 'created_at']
+    search_fields = ['name', 'user__username']
+
+
+@admin.register(MASSerialCounter)
+class MASSerialCounterAdmin(admin.ModelAdmin):
+    list_display = ['project', 'last_serial']
+
+
+@admin.register(MASChain)
+class MASChainAdmin(admin.ModelAdmin):
+    list_display = ['id', 'project', 'root', 'head', 'revision_count', 'status', 'updated_at']
+    list_filter = ['status', 'project']
+    raw_id_fields = ['root', 'head']
@@ -4,3 +4,28 @@ from django.apps import AppConfig
 class MasSheetsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mas_sheets"
+
+    def ready(self):
+        # Register the MAS projections with the event store
+        from . import projections  # noqa: F401
+
+        # Whether the FTS5 search table exists is checked per connection and after migrations
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from .search import reset_fts_enabled
+
+        connection_created.connect(reset_fts_enabled, dispatch_uid='mas_search_fts_connection')
+        post_migrate.connect(reset_fts_enabled, dispatch_uid='mas_search_fts_migrate')
+
+        # Catalog, assignment and user changes invalidate the cached history filter options
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from projects.models import Building, BuildingRole, Project, ProjectVendor
+        from services.models import Item, Service
+        from .history_options import bump_options_version
+
+        for model in (Project, Building, Service, Item, BuildingRole, ProjectVendor, get_user_model()):
+            post_save.connect(bump_options_version, sender=model, dispatch_uid=f'mas_history_options_{model.__name__}')
+            post_delete.connect(bump_options_version, sender=model, dispatch_uid=f'mas_history_options_{model.__name__}')
+        m2m_changed.connect(bump_options_version, sender=ProjectVendor.services.through,
+                            dispatch_uid='mas_history_options_vendor_services')
@@ -0,0 +1,249 @@
+"""
+Archival of old MASActivityLog rows into monthly gzip-compressed JSON Lines partitions.
+
+Each partition (YYYY-MM.jsonl.gz) holds one month of logs, newest first, with the MAS fields the
+history filters and visibility rules need copied in, so reading it needs no database joins. A
+manifest.json next to them lists the partitions with their row counts and time span; readers
+only open the partitions whose month overlaps the requested range.
+"""
+import gzip
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import MASActivityLog
+
+MANIFEST_NAME = 'manifest.json'
+# Log fields copied as-is into archive records
+LOG_FIELDS = [
+    'id', 'action', 'user_id', 'username', 'details', 'project_name', 'building_name', 'service_name',
+    'item_name', 'make', 'status',
+]
+# Record key -> MAS field lookup, copied so filters and visibility checks need no joins
+MAS_FIELDS = {
+    'mas_id': 'mas__mas_id',
+    'mas_pk': 'mas_id',
+    'creator_id': 'mas__creator_id',
+    'reviewer_id': 'mas__reviewer_id',
+    'approver_id': 'mas__approver_id',
+    'project_id': 'mas__project_id',
+    'building_id': 'mas__building_id',
+    'service_id': 'mas__service_id',
+    'item_id': 'mas__item_id',
+}
+ACTION_LABELS = dict(MASActivityLog.ACTION_CHOICES)
+
+
+def archive_dir():
+    return str(settings.MAS_LOG_ARCHIVE_DIR)
+
+
+def read_manifest():
+    """The manifest's partitions, oldest month first ([] when nothing is archived)"""
+    try:
+        with open(os.path.join(archive_dir(), MANIFEST_NAME)) as f:
+            return json.load(f)['partitions']
+    except FileNotFoundError:
+        return []
+
+
+def _write_manifest(partitions):
+    _atomic_write(MANIFEST_NAME, json.dumps({'partitions': sorted(partitions, key=lambda p: p['month'])},
+                                            indent=2).encode())
+
+
+def _atomic_write(name, data):
+    os.makedirs(archive_dir(), exist_ok=True)
+    path = os.path.join(archive_dir(), name)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value):
+    return value.replace(year=value.year + 1, month=1) if value.month == 12 else value.replace(month=value.month + 1)
+
+
+def _month_bounds(month):
+    start = timezone.make_aware(datetime.strptime(month, '%Y-%m'))
+    return start, _next_month(start)
+
+
+def _read_partition(filename):
+    return list(_iter_partition(filename))
+
+
+def _iter_partition(filename):
+    try:
+        with gzip.open(os.path.join(archive_dir(), filename), 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+
+def _write_partition(filename, records):
+    """Write `records` to partition `filename` through a temporary file; returns the manifest entry"""
+    os.makedirs(archive_dir(), exist_ok=True)
+    path = os.path.join(archive_dir(), filename)
+    tmp = f'{path}.tmp'
+    entry = {'file': filename, 'rows': 0, 'first': None, 'last': None}
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            entry['rows'] += 1
+            entry['last'] = entry['last'] or record['timestamp']
+            entry['first'] = record['timestamp']
+    os.replace(tmp, path)
+    return entry
+
+
+def _merge_newest_first(*sources):
+    """Merge record streams sorted newest first, keeping the first record seen for each log id"""
+    key = lambda record: (record['timestamp'], record['id'])
+    previous = None
+    for record in heapq.merge(*sources, key=key, reverse=True):
+        if previous is None or key(record) != key(previous):
+            yield record
+        previous = record
+
+
+def _log_records(logs, stats):
+    """Archive records of `logs`, newest first, streamed; counts them and their max id into `stats`"""
+    rows = (
+        logs.order_by('-timestamp', '-id')
+        .values('timestamp', *LOG_FIELDS, *MAS_FIELDS.values())
+        .iterator(chunk_size=2000)
+    )
+    for row in rows:
+        record = {field: row[field] for field in LOG_FIELDS}
+        record.update({key: row[lookup] for key, lookup in MAS_FIELDS.items()})
+        record['timestamp'] = row['timestamp'].isoformat()
+        stats['rows'] += 1
+        stats['max_id'] = max(stats['max_id'], record['id'])
+        yield record
+
+
+def archive_logs(older_than_days=None, stdout=None):
+    """
+    Move logs older than `older_than_days` (default settings.MAS_LOG_ARCHIVE_AFTER_DAYS), rounded
+    down to a month boundary, into monthly partitions. Each month is written to disk before its
+    rows are deleted; re-running after an interruption merges by log id, so no row is lost or
+    duplicated. Returns the number of rows archived.
+    """
+    days = settings.MAS_LOG_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = _month_start(timezone.localtime(timezone.now() - timedelta(days=days)))
+    manifest = {partition['month']: partition for partition in read_manifest()}
+    archived = 0
+
+    oldest = MASActivityLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp').values_list(
+        'timestamp', flat=True).first()
+    if oldest is None:
+        return 0
+    month_start = _month_start(timezone.localtime(oldest))
+    while month_start < cutoff:
+        month_end = _next_month(month_start)
+        month = month_start.strftime('%Y-%m')
+        month_logs = MASActivityLog.objects.filter(timestamp__gte=month_start, timestamp__lt=month_end)
+        stats = {'rows': 0, 'max_id': 0}
+
+        if month_logs.exists():
+            filename = f'{month}.jsonl.gz'
+            # Rows and the existing partition are both streamed newest first, so a month is never
+            # held in memory; rows already archived by an interrupted run are written once
+            records = _merge_newest_first(_log_records(month_logs, stats), _iter_partition(filename))
+            entry = _write_partition(filename, records)
+            manifest[month] = {'month': month, **entry}
+            _write_manifest(manifest.values())
+            # The exported range, bounded so that logs inserted since then are kept
+            with transaction.atomic():
+                month_logs.filter(id__lte=stats['max_id']).delete()
+            archived += stats['rows']
+            if stdout:
+                stdout.write(f"{month}: archived {stats['rows']} logs")
+        month_start = month_end
+    return archived
+
+
+class ArchivedLog:
+    """A log entry read back from an archive partition, shaped like MASActivityLog for templates"""
+    user = None
+
+    def __init__(self, record):
+        for key, value in record.items():
+            setattr(self, key, value)
+        self.timestamp = parse_datetime(record['timestamp'])
+        self.mas = SimpleNamespace(pk=record['mas_pk'], mas_id=record['mas_id'])
+        self.archived = True
+
+    def get_action_display(self):
+        return ACTION_LABELS.get(self.action, self.action)
+
+
+def _matches(record, filters, scope):
+    if 'building_ids' in scope and record['building_id'] not in scope['building_ids']:
+        return False
+    if 'creator_id' in scope and record['creator_id'] != scope['creator_id']:
+        return False
+    for key, field in (('created_by', 'creator_id'), ('reviewed_by', 'reviewer_id'),
+                       ('approved_by', 'approver_id'), ('service', 'service_id'), ('item', 'item_id'),
+                       ('project', 'project_id'), ('building', 'building_id')):
+        value = filters.get(key)
+        if value and str(record[field]) != str(value):
+            return False
+    if filters.get('make') and record['make'] != filters['make']:
+        return False
+    if filters.get('action') and record['action'] != filters['action']:
+        return False
+    if filters.get('mas_id') and filters['mas_id'].lower() not in (record['mas_id'] or '').lower():
+        return False
+    return True
+
+
+def archived_logs(start=None, end=None, filters=None, scope=None, limit=None, before=None):
+    """
+    Archived logs in [start, end) matching the history `filters` and visibility `scope`
+    ({'building_ids': [...]} or {'creator_id': id}), newest first, at most `limit`.
+    `before` is a (timestamp, id) keyset cursor: only logs strictly older are returned.
+    Only partitions whose month overlaps the range are opened.
+    """
+    filters = filters or {}
+    scope = scope or {}
+    results = []
+    for partition in reversed(read_manifest()):
+        month_start, month_end = _month_bounds(partition['month'])
+        if (end and month_start >= end) or (start and month_end <= start):
+            continue
+        if before and month_start > before[0]:
+            continue
+        for record in _read_partition(partition['file']):
+            if _matches(record, filters, scope):
+                log = ArchivedLog(record)
+                if (start and log.timestamp < start) or (end and log.timestamp >= end):
+                    continue
+                if before and (log.timestamp, log.id) >= before:
+                    continue
+                results.append(log)
+                if limit is not None and len(results) >= limit:
+                    return results
+    return results
+
+
+def archive_horizon():
+    """End of the newest archived month, or None when nothing is archived"""
+    partitions = read_manifest()
+    if not partitions:
+        return None
+    return _month_bounds(partitions[-1]['month'])[1]
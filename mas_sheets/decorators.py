@@ -1,6 +1,8 @@
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import user_passes_test
+from django.db import transaction
 from functools import wraps
+from .models import buffered_activity_logs
 
 def reviewer_required(function):
     @wraps(function)
@@ -16,4 +18,19 @@ def approver_required(function):
         if request.user.level == 'Approver':
             return function(request, *args, **kwargs)
         raise PermissionDenied
-    return wrap
\ No newline at end of file
+    return wrap
+
+def atomic_workflow(function):
+    """
+    Run a workflow view's POST handling in one transaction, so the MAS write(s) and their
+    activity log entries are committed together (one commit instead of one per save()).
+    Activity logs are buffered and written with one INSERT just before the commit.
+    GET requests stay in autocommit.
+    """
+    @wraps(function)
+    def wrap(request, *args, **kwargs):
+        if request.method != 'POST':
+            return function(request, *args, **kwargs)
+        with transaction.atomic(), buffered_activity_logs():
+            return function(request, *args, **kwargs)
+    return wrap
@@ -0,0 +1,42 @@
+"""
+Facet counts for the MAS history and list filters.
+
+For every faceted filter, the records are grouped by that filter's field with all the
+other active filters applied. The result is the number each option would match if the
+user picked it, at one grouped query per facet. Results are cached per visibility scope
+and filter signature for FACET_CACHE_TIMEOUT, which bounds how far they can lag behind
+new records; writes do not invalidate them.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+
+FACET_CACHE_TIMEOUT = 60 * 5
+
+
+def filter_signature(filters):
+    """Stable digest of the active (non-empty) filters"""
+    active = sorted((key, str(value)) for key, value in filters.items() if value)
+    return hashlib.sha1(json.dumps(active).encode()).hexdigest()
+
+
+def facet_counts(queryset, facets, filters, apply_filters, scope):
+    """
+    {facet: {option value: count}} for `queryset`, where `facets` maps each filter name to
+    the field it filters on and `apply_filters(queryset, filters, exclude=name)` applies
+    every filter except `name`. `scope` identifies the caller's view and visibility.
+    """
+    key = f'mas_facets:{scope}:{filter_signature(filters)}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = {}
+        for name, field in facets.items():
+            rows = (
+                apply_filters(queryset, filters, exclude=name)
+                .order_by().values_list(field).annotate(count=Count('pk'))
+            )
+            counts[name] = {str(value): count for value, count in rows if value not in (None, '')}
+        cache.set(key, counts, FACET_CACHE_TIMEOUT)
+    return counts
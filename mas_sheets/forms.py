@@ -1,10 +1,28 @@
 from django import forms
-from .models import MAS
+from django.db import transaction
+from .models import (
+    MAS, MASChain, MASSerialCounter, DUPLICATE_ITEM_MESSAGE, buffered_activity_logs, is_duplicate_item_error,
+    move_mas_counters,
+)
+from .search import index_mas
 from projects.models import Project, Building
 from services.models import Service, Item
 from django.core.exceptions import ValidationError
+from collections import Counter
+import csv
+import io
 import mimetypes
 
+
+def validate_mas_attachment(attachment):
+    """Check an MAS attachment is a PDF or JPEG of at most 5MB"""
+    if attachment.size > 5242880:  # 5MB limit
+        raise ValidationError("File size must not exceed 5MB.")
+    content_type = mimetypes.guess_type(attachment.name)[0]
+    if content_type not in ['application/pdf', 'image/jpeg', 'image/jpg']:
+        raise ValidationError("Only PDF and JPEG files are allowed.")
+
+
 class MASForm(forms.ModelForm):
     make_choices = forms.ChoiceField(choices=[], required=True)
     other_make = forms.CharField(max_length=200, required=False)
@@ -174,18 +192,14 @@ class MASForm(forms.ModelForm):
             self.fields['service'].widget.attrs['class'] = self.fields['service'].widget.attrs.get('class', 'form-control') + ' bg-light'
             self.fields['item'].widget.attrs['class'] = self.fields['item'].widget.attrs.get('class', 'form-control') + ' bg-light'
     
+    def add_duplicate_item_error(self):
+        """Report a unique_latest_mas_per_vendor_item violation raised while saving"""
+        self.add_error('item', DUPLICATE_ITEM_MESSAGE)
+    
     def clean_attachment(self):
         attachment = self.cleaned_data.get('attachment')
         if attachment:
-            # Get file size
-            file_size = attachment.size
-            if file_size > 5242880:  # 5MB limit
-                raise ValidationError("File size must not exceed 5MB.")
-            
-            # Check file type
-            content_type = mimetypes.guess_type(attachment.name)[0]
-            if content_type not in ['application/pdf', 'image/jpeg', 'image/jpg']:
-                raise ValidationError("Only PDF and JPEG files are allowed.")
+            validate_mas_attachment(attachment)
         
         return attachment
     
@@ -193,8 +207,6 @@ class MASForm(forms.ModelForm):
         cleaned_data = super().clean()
         make_choices = cleaned_data.get('make_choices')
         other_make = cleaned_data.get('other_make')
-        project = cleaned_data.get('project')
-        item = cleaned_data.get('item')
         
         if make_choices == 'other' and not other_make:
             raise ValidationError({'other_make': 'This field is required when selecting Other as make.'})
@@ -211,31 +223,226 @@ class MASForm(forms.ModelForm):
             except (ItemMake.DoesNotExist, ValueError, TypeError):
                 cleaned_data['make'] = make_choices
         
-        # Prevent duplicate MAS creation for the same Project + Item by the same vendor
-        # If any latest MAS exists for this pair, vendor should revise existing instead of creating a new one
-        if project and item:
-            existing_qs = MAS.objects.filter(
-                creator=self.user,
-                project=project,
-                item=item,
-                is_latest=True,
-            )
-            # When editing, ignore the current instance
-            if self.instance and self.instance.pk:
-                existing_qs = existing_qs.exclude(pk=self.instance.pk)
-            
-            # When submitting a revision, allow the same item if it's part of the same MAS chain
-            if self.revision_mas_id:
-                existing_qs = existing_qs.exclude(mas_id=self.revision_mas_id)
-
-            if existing_qs.exists():
-                raise ValidationError(
-                    {
-                        'item': (
-                            'An MAS already exists for this Item in the selected Project. '
-                            'Please submit a revision to the existing MAS instead of creating a new one.'
-                        )
-                    }
+        # Duplicate MAS for the same Project + Item by the same vendor are rejected by the
+        # unique_latest_mas_per_vendor_item constraint; views report it via add_duplicate_item_error()
+        return cleaned_data
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """File field accepting several uploads; cleans to a list of files"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)] if data else []
+
+
+class MASBatchForm(forms.Form):
+    """
+    Submit many MAS for one project/building/service at once.
+    The CSV lists one MAS per row (columns: item, make, attachment) where attachment is the
+    file name of one of the uploaded attachments.
+    """
+    MAX_ROWS = 200
+    CSV_COLUMNS = ['item', 'make', 'attachment']
+
+    project = forms.ModelChoiceField(queryset=Project.objects.none(), widget=forms.Select(attrs={'class': 'form-control'}))
+    building = forms.ModelChoiceField(queryset=Building.objects.none(), widget=forms.Select(attrs={'class': 'form-control'}))
+    service = forms.ModelChoiceField(queryset=Service.objects.all(), widget=forms.Select(attrs={'class': 'form-control'}))
+    csv_file = forms.FileField(label='Items CSV', help_text='Columns: item, make, attachment (one MAS per row)')
+    attachments = MultipleFileField(help_text='Upload the PDF or JPEG file named in each CSV row (max 5MB each)')
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user')
+        super().__init__(*args, **kwargs)
+        from projects.models import ProjectVendor
+
+        self.vendor_assignments = ProjectVendor.objects.filter(user=self.user)
+        project_ids = self.vendor_assignments.values_list('project_id', flat=True)
+        self.fields['project'].queryset = Project.objects.filter(id__in=project_ids)
+        self.fields['building'].queryset = Building.objects.filter(project_id__in=project_ids)
+        self.rows = []
+
+    def clean_csv_file(self):
+        csv_file = self.cleaned_data['csv_file']
+        try:
+            text = csv_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValidationError('The CSV file must be UTF-8 encoded.')
+        reader = csv.DictReader(io.StringIO(text))
+        columns = [c.strip().lower() for c in (reader.fieldnames or [])]
+        if any(c not in columns for c in self.CSV_COLUMNS):
+            raise ValidationError(f"The CSV must have the columns: {', '.join(self.CSV_COLUMNS)}.")
+        rows = [
+            {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}
+            for row in reader
+        ]
+        rows = [row for row in rows if any(row.values())]
+        if not rows:
+            raise ValidationError('The CSV file has no rows.')
+        if len(rows) > self.MAX_ROWS:
+            raise ValidationError(f'A batch can contain at most {self.MAX_ROWS} rows.')
+        return rows
+
+    def clean(self):
+        cleaned_data = super().clean()
+        project = cleaned_data.get('project')
+        building = cleaned_data.get('building')
+        service = cleaned_data.get('service')
+        rows = cleaned_data.get('csv_file')
+        attachments = cleaned_data.get('attachments') or []
+        if not (project and building and service and rows):
+            return cleaned_data
+
+        if building.project_id != project.id:
+            raise ValidationError({'building': 'Select a building of the selected project.'})
+        pv = self.vendor_assignments.filter(project=project).prefetch_related('services').first()
+        if pv and pv.building_id and pv.building_id != building.id:
+            raise ValidationError({'building': 'You are not assigned to this building.'})
+        assigned_service_ids = {s.id for s in pv.services.all()} if pv else set()
+        if assigned_service_ids and service.id not in assigned_service_ids:
+            raise ValidationError({'service': 'You are not assigned to this service.'})
+
+        # Everything needed to validate the rows, loaded once for the whole batch
+        from services.models import ItemMake
+        items_by_name = {i.name.strip().lower(): i for i in Item.objects.filter(service=service)}
+        makes_by_item = {}
+        for item_id, name in ItemMake.objects.filter(item__service=service).values_list('item_id', 'name'):
+            makes_by_item.setdefault(item_id, {})[name.strip().lower()] = name
+        blocked_item_ids = set(MAS.objects.filter(
+            creator=self.user,
+            project=project,
+            is_latest=True,
+        ).values_list('item_id', flat=True))
+        files_by_name = {}
+        for attachment in attachments:
+            files_by_name[attachment.name] = attachment
+
+        errors = []
+        seen_item_ids = set()
+        used_files = set()
+        self.rows = []
+        for line_no, row in enumerate(rows, start=2):
+            item = items_by_name.get(row['item'].lower())
+            if item is None:
+                errors.append(f"Row {line_no}: '{row['item']}' is not an item of {service}.")
+                continue
+            if item.id in blocked_item_ids:
+                errors.append(
+                    f"Row {line_no}: An MAS already exists for {item.name} in this Project. "
+                    f"Please submit a revision to the existing MAS instead."
                 )
+                continue
+            if item.id in seen_item_ids:
+                errors.append(f"Row {line_no}: {item.name} appears more than once in the batch.")
+                continue
+            seen_item_ids.add(item.id)
+
+            if not row['make']:
+                errors.append(f"Row {line_no}: Make is required.")
+                continue
+            known_make = makes_by_item.get(item.id, {}).get(row['make'].lower())
+
+            attachment = files_by_name.get(row['attachment'])
+            if attachment is None:
+                errors.append(f"Row {line_no}: Attachment '{row['attachment']}' was not uploaded.")
+                continue
+            if row['attachment'] in used_files:
+                errors.append(f"Row {line_no}: Attachment '{row['attachment']}' is used by more than one row.")
+                continue
+            used_files.add(row['attachment'])
+            try:
+                validate_mas_attachment(attachment)
+            except ValidationError as e:
+                errors.append(f"Row {line_no}: {row['attachment']}: {' '.join(e.messages)}")
+                continue
+
+            self.rows.append({
+                'item': item,
+                'make': known_make or row['make'],
+                'other_make': None if known_make else row['make'],
+                'attachment': attachment,
+            })
+
+        if errors:
+            raise ValidationError(errors)
+        return cleaned_data
+
+    def is_duplicate_item_error(self, error):
+        """True when `error` from save() means another submission took one of the batch's items"""
+        return is_duplicate_item_error(error, MAS.objects.filter(
+            creator=self.user,
+            project=self.cleaned_data['project'],
+            item_id__in=[row['item'].id for row in self.rows],
+        ))
+
+    def save(self):
+        """Create every MAS of the batch, with their activity logs, in one transaction"""
+        project = self.cleaned_data['project']
+        building = self.cleaned_data['building']
+        service = self.cleaned_data['service']
+
+        with transaction.atomic():
+            precedents = {}
+            if project.mas_fast_track:
+                for precedent in MAS.objects.filter(
+                    project=project,
+                    item_id__in=[row['item'].id for row in self.rows],
+                    status='approved',
+                ).only('id', 'mas_id', 'item_id', 'make'):
+                    precedents[(precedent.item_id, precedent.make)] = precedent
+
+            first_serial = MASSerialCounter.reserve(project.id, len(self.rows))
+            mas_objects = []
+            fast_tracked = {}
+            for offset, row in enumerate(self.rows):
+                mas = MAS(
+                    project=project,
+                    building=building,
+                    service=service,
+                    item=row['item'],
+                    make=row['make'],
+                    other_make=row['other_make'],
+                    attachment=row['attachment'],
+                    creator=self.user,
+                    serial_number=first_serial + offset,
+                )
+                mas.mas_id = mas.build_mas_id()
+                precedent = precedents.get((row['item'].id, row['make']))
+                if precedent and mas.apply_fast_track(precedent=precedent):
+                    fast_tracked[mas.mas_id] = precedent
+                mas_objects.append(mas)
+            # Each MAS starts its own revision chain
+            chains = MASChain.objects.bulk_create(
+                MASChain(project=project, status=mas.status) for mas in mas_objects
+            )
+            for mas, chain in zip(mas_objects, chains):
+                mas.chain = chain
+            created = MAS.objects.bulk_create(mas_objects)
+            for mas, chain in zip(created, chains):
+                chain.root = chain.head = mas
+            MASChain.objects.bulk_update(chains, ['root', 'head'])
+            for status, count in Counter(mas.status for mas in created).items():
+                move_mas_counters(new=(project.id, building.id, status), count=count)
+            for mas in created:
+                mas._counted_state = mas._counter_state()
+            index_mas([mas.pk for mas in created])
 
-        return cleaned_data
\ No newline at end of file
+            with buffered_activity_logs():
+                for mas in created:
+                    mas.log_activity('created', self.user, 'MAS created (batch submission)')
+                    precedent = fast_tracked.get(mas.mas_id)
+                    if precedent:
+                        mas.log_activity('fast_tracked', self.user,
+                                         f'Fast-track rule "{project.get_mas_fast_track_display()}" applied: '
+                                         f'{mas.item.name} / {mas.make} already approved in {precedent.mas_id}')
+        return created
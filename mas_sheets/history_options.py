@@ -0,0 +1,178 @@
+"""
+Cached filter option lists for the MAS history page.
+
+Option sets are cached per visibility scope: admins share one entry, while team members
+and vendors get their own. The users, projects, buildings, services and items offered
+are built from the catalog and the assignments (building roles, vendor assignments)
+only, never from MAS rows, so MAS writes leave the cache alone. Every key embeds a
+version stamp that is renewed after any change to the catalog (projects, buildings,
+services, items), the assignments or the users.
+
+The small lists are rendered with the page. The large ones (`LAZY_OPTIONS`) are fetched
+on demand through the mas_history_options endpoint, and MAS IDs are suggested by prefix
+through the MAS ID autocomplete endpoint. Makes and MAS IDs do come from MAS data, so
+they are cached for a few minutes at most instead of being invalidated by MAS writes.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+VERSION_KEY = 'mas_history_options:version'
+OPTIONS_TIMEOUT = 60 * 60
+# Lists built from MAS data may lag new MAS by this long
+MAS_DATA_TIMEOUT = 60 * 5
+MAS_ID_SUGGESTIONS_TIMEOUT = 60
+MAS_ID_SUGGESTIONS_LIMIT = 20
+
+
+def options_version():
+    """Current version stamp of the option caches"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def bump_options_version(**kwargs):
+    """
+    Invalidate every cached option set once the current transaction commits.
+    Accepts and ignores signal arguments so it can be connected as a receiver.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        # Logging in saves the user but changes no option
+        return
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time_ns(), None))
+
+
+def scope_key(user):
+    """Cache key part for the user's visibility scope"""
+    return 'all' if user.user_type == 'Admin' else f'user{user.pk}'
+
+
+def _cached(user, name, build, timeout=OPTIONS_TIMEOUT):
+    key = f'mas_history_options:{options_version()}:{scope_key(user)}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = build(user)
+        cache.set(key, value, timeout)
+    return value
+
+
+def _assigned_buildings(user):
+    from projects.models import BuildingRole
+    return BuildingRole.objects.filter(user=user).values_list('building', flat=True)
+
+
+def _build_filter_options(user):
+    from accounts.models import CustomUser
+    from projects.models import Building, Project, ProjectVendor
+    from services.models import Item, Service
+
+    if user.user_type == 'Admin':
+        # Admin sees all options
+        users = CustomUser.objects.filter(is_active=True)
+        projects = Project.objects.all()
+        buildings = Building.objects.all()
+        services = Service.objects.all()
+        items = Item.objects.all()
+    elif user.user_type == 'Team':
+        # Team members see options from their assigned buildings
+        assigned_buildings = _assigned_buildings(user)
+        assigned_projects = Building.objects.filter(id__in=assigned_buildings).values_list('project', flat=True)
+        # Vendors assigned to those buildings, or to their whole project
+        vendors = ProjectVendor.objects.filter(project_id__in=assigned_projects).filter(
+            Q(building__isnull=True) | Q(building_id__in=assigned_buildings)
+        )
+        users = CustomUser.objects.filter(
+            Q(id=user.id) |  # Self
+            Q(id__in=vendors.values('user')) |  # Vendors working in their buildings
+            Q(buildingrole__building_id__in=assigned_buildings)  # Reviewers and approvers
+        ).filter(is_active=True).distinct()
+        projects = Project.objects.filter(id__in=assigned_projects)
+        buildings = Building.objects.filter(id__in=assigned_buildings)
+        # Services of those vendors
+        services = Service.objects.filter(id__in=vendors.values('services'))
+        items = Item.objects.filter(service__in=services)
+    else:  # Vendor
+        # Vendors see options from their own projects/buildings
+        assignments = ProjectVendor.objects.filter(user=user)
+        # Users: self and team members from their projects
+        users = CustomUser.objects.filter(
+            Q(id=user.id) |
+            Q(buildingrole__building__project_id__in=assignments.values('project'))
+        ).filter(is_active=True).distinct()
+        projects = Project.objects.filter(id__in=assignments.values('project'))
+        # Assigned buildings, or every building of a project assigned as a whole
+        buildings = Building.objects.filter(
+            Q(id__in=assignments.values('building')) |
+            Q(project_id__in=assignments.filter(building__isnull=True).values('project'))
+        )
+        # Assigned services and their items
+        services = Service.objects.filter(id__in=assignments.values('services'))
+        items = Item.objects.filter(service__in=services)
+
+    return {
+        'users': list(users.order_by('username').values('id', 'username')),
+        'projects': list(projects.order_by('name').values('id', 'name')),
+        'buildings': list(buildings.order_by('name').values('id', 'name')),
+        'services': list(services.order_by('name').values('id', 'name')),
+        'items': list(items.order_by('name').values('id', 'name')),
+    }
+
+
+def filter_options(user):
+    """Users, projects, buildings, services and items the user can filter history by"""
+    return _cached(user, 'lists', _build_filter_options)
+
+
+def _build_makes(user):
+    from .models import MASActivityLog
+
+    logs = MASActivityLog.objects.all()
+    if user.user_type == 'Team':
+        logs = logs.filter(mas__building_id__in=_assigned_buildings(user))
+    elif user.user_type != 'Admin':
+        logs = logs.filter(mas__creator=user)
+    return list(logs.exclude(make='').order_by('make').values_list('make', flat=True).distinct())
+
+
+LAZY_OPTIONS = {
+    'makes': _build_makes,
+}
+
+
+def lazy_options(user, name):
+    """One of the large option lists in `LAZY_OPTIONS`; raises KeyError for unknown names"""
+    return _cached(user, name, LAZY_OPTIONS[name], MAS_DATA_TIMEOUT)
+
+
+def _mas_id_suggestion_queryset(user, prefix):
+    from .models import MAS
+
+    mas = MAS.objects.filter(is_latest=True, mas_id__gte=prefix, mas_id__lt=prefix + '\uffff')
+    if user.user_type == 'Team':
+        mas = mas.filter(building_id__in=_assigned_buildings(user))
+    elif user.user_type != 'Admin':
+        mas = mas.filter(creator=user)
+    return mas.order_by('mas_id').values_list('mas_id', flat=True)
+
+
+def mas_id_suggestions(user, prefix, limit=MAS_ID_SUGGESTIONS_LIMIT):
+    """
+    Up to `limit` MAS IDs visible to `user` that start with `prefix`, in order.
+    The prefix becomes the range mas_id >= prefix AND mas_id < prefix + U+FFFF, a seek on
+    mas_masid_latest_idx. Only chain heads are read, one row per MAS ID, so no DISTINCT
+    is needed. Matching is case-sensitive, like the IDs themselves.
+    """
+    def build(user):
+        return list(_mas_id_suggestion_queryset(user, prefix)[:limit])
+
+    # Typed text is hashed so any prefix makes a valid cache key
+    digest = hashlib.sha1(prefix.encode()).hexdigest()
+    return _cached(user, f'mas_ids:{limit}:{digest}', build, MAS_ID_SUGGESTIONS_TIMEOUT)
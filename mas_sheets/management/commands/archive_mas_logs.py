@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from mas_sheets.archive import archive_logs
+
+
+class Command(BaseCommand):
+    help = (
+        'Move MAS activity logs older than --older-than-days (rounded down to a whole month) into '
+        'monthly compressed JSONL partitions under MAS_LOG_ARCHIVE_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.MAS_LOG_ARCHIVE_AFTER_DAYS)
+
+    def handle(self, *args, **options):
+        archived = archive_logs(options['older_than_days'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} activity logs.'))
@@ -0,0 +1,180 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery
+
+from mas_sheets.models import MAS, MASChain, MASSerialCounter, rebuild_mas_counters
+
+
+def find_head_anomalies():
+    """Chains whose revisions carry no is_latest row or more than one, as {chain_id: head count}"""
+    rows = (
+        MAS.objects.filter(chain__isnull=False)
+        .values('chain_id')
+        .annotate(heads=Count('pk', filter=Q(is_latest=True)))
+        .exclude(heads=1)
+        .values_list('chain_id', 'heads')
+    )
+    return dict(rows)
+
+
+def find_orphaned_parents():
+    """
+    MAS rows whose parent_mas pointer is wrong: a revision pointing outside its own chain
+    or at nothing, or an original (R0) pointing at anything
+    """
+    return MAS.objects.filter(chain__isnull=False).filter(
+        Q(revision__gt=0, parent_mas__isnull=True)
+        | Q(revision__gt=0, parent_mas__isnull=False) & ~Q(parent_mas__chain_id=F('chain_id'))
+        | Q(revision=0, parent_mas__isnull=False)
+    )
+
+
+def find_duplicate_serials():
+    """(project_id, serial_number) pairs shared by more than one chain, as {pair: chain count}"""
+    rows = (
+        MAS.objects.values('project_id', 'serial_number')
+        .annotate(chains=Count('chain_id', distinct=True))
+        .filter(chains__gt=1)
+        .values_list('project_id', 'serial_number', 'chains')
+    )
+    return {(project_id, serial): chains for project_id, serial, chains in rows}
+
+
+def find_stale_chain_heads():
+    """Chains whose head pointer is missing or does not reference their latest revision"""
+    return MASChain.objects.exclude(head__is_latest=True, head__chain_id=F('pk'))
+
+
+class Command(BaseCommand):
+    help = (
+        'Audit MAS revision chains for zero or multiple latest revisions, orphaned parent_mas '
+        'pointers, duplicate serial numbers and stale chain heads. Use --repair to fix them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Fix the anomalies found in bulk')
+        parser.add_argument('--show', type=int, default=20, help='Number of example IDs to print per check')
+
+    def handle(self, *args, **options):
+        self.show = options['show']
+
+        head_anomalies = find_head_anomalies()
+        no_head = [chain_id for chain_id, heads in head_anomalies.items() if heads == 0]
+        multi_head = [chain_id for chain_id, heads in head_anomalies.items() if heads > 1]
+        orphaned = list(find_orphaned_parents().values_list('pk', flat=True))
+        duplicate_serials = find_duplicate_serials()
+        stale_heads = list(find_stale_chain_heads().values_list('pk', flat=True))
+
+        self.report('Chains with no latest revision', no_head)
+        self.report('Chains with multiple latest revisions', multi_head)
+        self.report('MAS with orphaned parent_mas', orphaned)
+        self.report('Duplicate project serials', [f'{p}/{s}' for p, s in duplicate_serials])
+        self.report('Chains with a stale head pointer', stale_heads)
+
+        if not options['repair']:
+            return
+        if not (head_anomalies or orphaned or duplicate_serials or stale_heads):
+            self.stdout.write(self.style.SUCCESS('Nothing to repair.'))
+            return
+
+        try:
+            with transaction.atomic():
+                self.repair_heads(no_head, multi_head)
+                self.repair_parents(orphaned)
+                self.repair_serials(duplicate_serials)
+                # Resync every chain touched above plus those already found stale
+                self.sync_chain_heads(find_stale_chain_heads())
+                # Heads were flipped with plain UPDATEs, so recount the project/building counters
+                rebuild_mas_counters()
+        except IntegrityError as e:
+            raise CommandError(f'Repair aborted, nothing was changed: {e}')
+        self.stdout.write(self.style.SUCCESS('Repair complete.'))
+
+    def report(self, label, ids):
+        if not ids:
+            self.stdout.write(f'{label}: 0')
+            return
+        sample = ', '.join(str(i) for i in ids[:self.show])
+        more = '' if len(ids) <= self.show else f' (+{len(ids) - self.show} more)'
+        self.stdout.write(self.style.WARNING(f'{label}: {len(ids)}') + f' [{sample}{more}]')
+
+    def repair_heads(self, no_head, multi_head):
+        """Make the highest revision of each affected chain its single latest revision"""
+        if multi_head:
+            top_latest = (
+                MAS.objects.filter(chain_id=OuterRef('chain_id'), is_latest=True)
+                .order_by('-revision', '-pk').values('pk')[:1]
+            )
+            cleared = (
+                MAS.objects.filter(chain_id__in=multi_head, is_latest=True)
+                .annotate(keep_pk=Subquery(top_latest))
+                .exclude(pk=F('keep_pk'))
+                .update(is_latest=False)
+            )
+            self.stdout.write(f'Cleared is_latest on {cleared} extra heads')
+        if no_head:
+            top = MAS.objects.filter(chain_id=OuterRef('chain_id')).order_by('-revision', '-pk').values('pk')[:1]
+            restored = (
+                MAS.objects.filter(chain_id__in=no_head)
+                .annotate(keep_pk=Subquery(top))
+                .filter(pk=F('keep_pk'))
+                .update(is_latest=True)
+            )
+            self.stdout.write(f'Restored {restored} missing heads')
+
+    def repair_parents(self, orphaned):
+        """Point revisions back at their chain's root and clear the pointer on originals"""
+        if not orphaned:
+            return
+        root = MASChain.objects.filter(pk=OuterRef('chain_id')).values('root_id')[:1]
+        fixed = MAS.objects.filter(pk__in=orphaned, revision__gt=0).update(parent_mas_id=Subquery(root))
+        fixed += MAS.objects.filter(pk__in=orphaned, revision=0).update(parent_mas=None)
+        self.stdout.write(f'Fixed {fixed} parent_mas pointers')
+
+    def repair_serials(self, duplicate_serials):
+        """
+        Keep each duplicated serial on its oldest chain and give the other chains fresh
+        serials (and MAS IDs) from the project's counter
+        """
+        if not duplicate_serials:
+            return
+        pairs = Q()
+        for project_id, serial in duplicate_serials:
+            pairs |= Q(project_id=project_id, serial_number=serial)
+        chains = (
+            MAS.objects.filter(pairs)
+            .values('project_id', 'serial_number', 'chain_id')
+            .annotate(first_pk=Min('pk'))
+            .order_by('project_id', 'serial_number', 'first_pk')
+        )
+        renumber = {}
+        seen = set()
+        for row in chains:
+            key = (row['project_id'], row['serial_number'])
+            if key in seen:
+                renumber.setdefault(row['project_id'], []).append(row['chain_id'])
+            seen.add(key)
+
+        renumbered = 0
+        for project_id, chain_ids in renumber.items():
+            first = MASSerialCounter.reserve(project_id, len(chain_ids))
+            heads = MAS.objects.filter(chain_id__in=chain_ids, revision=0).select_related(
+                'project', 'building', 'service'
+            )
+            by_chain = {mas.chain_id: mas for mas in heads}
+            for serial, chain_id in enumerate(chain_ids, start=first):
+                mas = by_chain.get(chain_id) or MAS.objects.filter(chain_id=chain_id).select_related(
+                    'project', 'building', 'service'
+                ).first()
+                mas.serial_number = serial
+                MAS.objects.filter(chain_id=chain_id).update(serial_number=serial, mas_id=mas.build_mas_id())
+                renumbered += 1
+        self.stdout.write(f'Renumbered {renumbered} chains with duplicate serials')
+
+    def sync_chain_heads(self, chains):
+        """Point chains at their latest revision and refresh the denormalised status and count"""
+        empty = MASChain.objects.filter(pk__in=chains.values('pk'), revisions__isnull=True).delete()[0]
+        if empty:
+            self.stdout.write(f'Deleted {empty} chains with no revisions')
+        synced = MASChain.sync_heads(chains.values('pk'))
+        self.stdout.write(f'Resynced {synced} chain head pointers')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mas_sheets.models import rebuild_mas_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the open/approved/rejected MAS counters on every Project and Building.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_mas_counters()
+        self.stdout.write(self.style.SUCCESS('MAS counters rebuilt.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mas_sheets.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MAS full-text search index (SQLite FTS5, or the inverted index on other databases).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='MAS per batch for the inverted index')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_index(batch_size=options['batch_size'])
+        backend = 'FTS5' if fts_enabled() else 'inverted index'
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} MAS ({backend}).'))
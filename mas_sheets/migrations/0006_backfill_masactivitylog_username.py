@@ -1,14 +1,23 @@
 from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+from mas.backfill import backfill_update, print_progress
 
 
 def backfill_usernames(apps, schema_editor):
     MASActivityLog = apps.get_model('mas_sheets', 'MASActivityLog')
-    for log in MASActivityLog.objects.filter(username="", user__isnull=False).select_related('user'):
-        log.username = log.user.username
-        log.save(update_fields=['username'])
+    User = MASActivityLog._meta.get_field('user').related_model
+    # One UPDATE per pk range; rows already filled are skipped, so a re-run resumes
+    backfill_update(
+        MASActivityLog.objects.filter(username="", user__isnull=False),
+        username=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('username')[:1]),
+        progress=print_progress('MASActivityLog.username'),
+    )
 
 
 class Migration(migrations.Migration):
+    # Commit each backfill chunk separately
+    atomic = False
 
     dependencies = [
         ("mas_sheets", "0005_masactivitylog_username"),
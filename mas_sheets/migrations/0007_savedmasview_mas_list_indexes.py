@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0006_backfill_masactivitylog_username"),
+        ("projects", "0005_buildingrole"),
+        ("services", "0003_backfill_servicelog_username"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedMASView",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("filters", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Saved MAS View",
+                "verbose_name_plural": "Saved MAS Views",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["is_latest", "status", "-updated_at"],
+                name="mas_latest_status_upd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["is_latest", "-updated_at"], name="mas_latest_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(fields=["created_at"], name="mas_created_at_idx"),
+        ),
+        migrations.AddField(
+            model_name="savedmasview",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="saved_mas_views",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="savedmasview",
+            unique_together={("user", "name")},
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0007_savedmasview_mas_list_indexes"),
+        ("projects", "0006_project_mas_fast_track"),
+        ("services", "0003_backfill_servicelog_username"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="masactivitylog",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("edited", "Edited"),
+                    ("submitted_review", "Submitted for Review"),
+                    ("reviewed", "Reviewed"),
+                    ("submitted_approval", "Submitted for Approval"),
+                    ("approved", "Approved"),
+                    ("rejected", "Rejected"),
+                    ("revision_requested", "Revision Requested"),
+                    ("revision_submitted", "Revision Submitted"),
+                    ("fast_tracked", "Fast-tracked"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["project", "item", "make", "status"],
+                name="mas_proj_item_make_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_serial_counters(apps, schema_editor):
+    MAS = apps.get_model("mas_sheets", "MAS")
+    MASSerialCounter = apps.get_model("mas_sheets", "MASSerialCounter")
+    MASSerialCounter.objects.bulk_create(
+        MASSerialCounter(project_id=row["project"], last_serial=row["last"])
+        for row in MAS.objects.values("project").annotate(last=Max("serial_number"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0008_mas_fast_track_index"),
+        ("projects", "0006_project_mas_fast_track"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MASSerialCounter",
+            fields=[
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="mas_serial_counter",
+                        serialize=False,
+                        to="projects.project",
+                    ),
+                ),
+                ("last_serial", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "MAS Serial Counter",
+                "verbose_name_plural": "MAS Serial Counters",
+            },
+        ),
+        migrations.RunPython(seed_serial_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0009_masserialcounter"),
+        ("projects", "0006_project_mas_fast_track"),
+        ("services", "0003_backfill_servicelog_username"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["mas_id", "is_latest"], name="mas_masid_latest_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:39
+
+import django.db.models.deletion
+from itertools import groupby
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from mas.backfill import backfill
+
+
+def backfill_chains(apps, schema_editor):
+    """Group existing revisions by mas_id into chains (root = oldest, head = latest)"""
+    MAS = apps.get_model("mas_sheets", "MAS")
+    MASChain = apps.get_model("mas_sheets", "MASChain")
+
+    def apply(chunk):
+        # Chain every revision of the mas_ids seen in this chunk, so later chunks skip them
+        mas_ids = set(chunk.values_list("mas_id", flat=True))
+        rows = (
+            MAS.objects.filter(mas_id__in=mas_ids)
+            .order_by("mas_id", "created_at", "id")
+            .values("id", "mas_id", "project_id", "status", "is_latest")
+        )
+        chains = []
+        size = 0
+        for _, revisions in groupby(rows, key=lambda row: row["mas_id"]):
+            revisions = list(revisions)
+            head = next(
+                (r for r in reversed(revisions) if r["is_latest"]), revisions[-1]
+            )
+            chains.append(
+                MASChain(
+                    project_id=revisions[0]["project_id"],
+                    root_id=revisions[0]["id"],
+                    head_id=head["id"],
+                    revision_count=len(revisions),
+                    status=head["status"],
+                )
+            )
+            size += len(revisions)
+        chains = MASChain.objects.bulk_create(chains, batch_size=500)
+        # One UPDATE for the chunk: each revision joins the new chain rooted at its mas_id
+        chain_for_mas_id = MASChain.objects.filter(
+            pk__in=[chain.pk for chain in chains], root__mas_id=OuterRef("mas_id")
+        ).values("pk")[:1]
+        MAS.objects.filter(mas_id__in=mas_ids).update(chain=Subquery(chain_for_mas_id))
+        return size
+
+    backfill(MAS.objects.filter(chain__isnull=True), apply, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0010_mas_masid_latest_index"),
+        ("projects", "0006_project_mas_fast_track"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MASChain",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("revision_count", models.PositiveIntegerField(default=1)),
+                ("status", models.CharField(blank=True, max_length=20)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "head",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="mas_sheets.mas",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mas_chains",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "root",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="mas_sheets.mas",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "MAS Chain",
+                "verbose_name_plural": "MAS Chains",
+            },
+        ),
+        migrations.AddField(
+            model_name="mas",
+            name="chain",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="revisions",
+                to="mas_sheets.maschain",
+            ),
+        ),
+        migrations.RunPython(backfill_chains, migrations.RunPython.noop),
+    ]
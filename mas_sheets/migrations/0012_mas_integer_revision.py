@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:45
+
+from django.db import migrations, models
+
+
+def revision_labels_to_numbers(apps, schema_editor):
+    MAS = apps.get_model("mas_sheets", "MAS")
+    for label in MAS.objects.values_list("revision", flat=True).distinct():
+        MAS.objects.filter(revision=label).update(revision_number=int(label.lstrip("Rr") or 0))
+
+
+def revision_numbers_to_labels(apps, schema_editor):
+    MAS = apps.get_model("mas_sheets", "MAS")
+    for number in MAS.objects.values_list("revision_number", flat=True).distinct():
+        MAS.objects.filter(revision_number=number).update(revision=f"R{number}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0011_maschain"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mas",
+            name="revision_number",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(revision_labels_to_numbers, revision_numbers_to_labels),
+        migrations.RemoveField(
+            model_name="mas",
+            name="revision",
+        ),
+        migrations.RenameField(
+            model_name="mas",
+            old_name="revision_number",
+            new_name="revision",
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["chain", "revision"], name="mas_chain_revision_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0012_mas_integer_revision"),
+        ("projects", "0006_project_mas_fast_track"),
+        ("services", "0003_backfill_servicelog_username"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="mas",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_latest", True)),
+                fields=("creator", "project", "item"),
+                name="unique_latest_mas_per_vendor_item",
+                violation_error_message="An MAS already exists for this Item in the selected Project. Please submit a revision to the existing MAS instead of creating a new one.",
+            ),
+        ),
+    ]
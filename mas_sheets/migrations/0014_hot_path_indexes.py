@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0013_unique_latest_mas_per_vendor_item"),
+        ("projects", "0006_project_mas_fast_track"),
+        ("services", "0004_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="mas",
+            name="mas_latest_updated_idx",
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                condition=models.Q(("is_latest", True)),
+                fields=["-updated_at"],
+                name="mas_latest_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                condition=models.Q(("is_latest", True)),
+                fields=["building", "status"],
+                name="mas_latest_bldg_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                condition=models.Q(("is_latest", True)),
+                fields=["creator", "status"],
+                name="mas_latest_creator_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["project", "serial_number"], name="mas_project_serial_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mas",
+            index=models.Index(
+                fields=["status", "approval_date"], name="mas_status_approval_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="masactivitylog",
+            index=models.Index(fields=["-timestamp"], name="maslog_timestamp_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="masactivitylog",
+            index=models.Index(
+                fields=["mas", "timestamp"], name="maslog_mas_timestamp_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count
+
+COUNTERS = {
+    "pending_review": "mas_open_count",
+    "pending_approval": "mas_open_count",
+    "revision_requested": "mas_open_count",
+    "approved": "mas_approved_count",
+    "rejected": "mas_rejected_count",
+}
+
+
+def populate_mas_counters(apps, schema_editor):
+    MAS = apps.get_model("mas_sheets", "MAS")
+    for model_name, fk in (("Project", "project"), ("Building", "building")):
+        model = apps.get_model("projects", model_name)
+        counts = {}
+        for row in (
+            MAS.objects.filter(is_latest=True)
+            .values(fk, "status")
+            .annotate(n=Count("pk"))
+        ):
+            field = COUNTERS.get(row["status"])
+            if field:
+                fields = counts.setdefault(row[fk], {})
+                fields[field] = fields.get(field, 0) + row["n"]
+        model.objects.bulk_update(
+            [model(pk=pk, **fields) for pk, fields in counts.items()],
+            ["mas_open_count", "mas_approved_count", "mas_rejected_count"],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0014_hot_path_indexes"),
+        ("projects", "0008_mas_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_mas_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:55
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+FTS_TABLE = "mas_sheets_mas_fts"
+
+
+def create_fts_index(apps, schema_editor):
+    """Create and fill the FTS5 search table on SQLite builds that have FTS5"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "mas_id, make, item, project, building, vendor, comments, "
+                "building_id UNINDEXED, creator_id UNINDEXED)"
+            )
+        except OperationalError:
+            # No FTS5 in this SQLite build: search uses the MASSearchTerm index
+            return
+        cursor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (rowid, mas_id, make, item, project, building, vendor,
+                                     comments, building_id, creator_id)
+            SELECT m.id, m.mas_id,
+                   m.make || ' ' || COALESCE(m.other_make, ''),
+                   i.name,
+                   p.name || ' ' || p.project_number,
+                   b.name,
+                   u.username || ' ' || u.first_name || ' ' || u.last_name,
+                   m.review_comment || ' ' || m.approval_comment,
+                   m.building_id, m.creator_id
+            FROM mas_sheets_mas m
+            JOIN services_item i ON i.id = m.item_id
+            JOIN projects_project p ON p.id = m.project_id
+            JOIN projects_building b ON b.id = m.building_id
+            JOIN accounts_customuser u ON u.id = m.creator_id
+            """
+        )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0015_populate_mas_counters"),
+        ("services", "0004_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MASSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=100)),
+                ("weight", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "mas",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="mas_sheets.mas",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "MAS Search Term",
+                "verbose_name_plural": "MAS Search Terms",
+                "indexes": [
+                    models.Index(
+                        fields=["term", "mas"], name="massearchterm_term_mas_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
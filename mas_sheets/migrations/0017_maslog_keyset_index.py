@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0016_mas_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="masactivitylog",
+            name="maslog_timestamp_idx",
+        ),
+        migrations.AddIndex(
+            model_name="masactivitylog",
+            index=models.Index(
+                fields=["-timestamp", "-id"], name="maslog_timestamp_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mas_sheets", "0017_maslog_keyset_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MASChainState",
+            fields=[
+                ("chain_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("head_id", models.BigIntegerField()),
+                ("project_id", models.BigIntegerField()),
+                ("building_id", models.BigIntegerField()),
+                ("status", models.CharField(max_length=20)),
+                ("revision", models.PositiveIntegerField(default=0)),
+                ("revision_count", models.PositiveIntegerField(default=1)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MASStatusCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("project_id", models.BigIntegerField()),
+                ("building_id", models.BigIntegerField()),
+                ("counter", models.CharField(max_length=30)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project_id", "building_id", "counter"),
+                        name="unique_mas_status_count",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,11 +1,136 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 from projects.models import Project, Building
 from services.models import Service, Item
+from events.models import Event, EventCode, MAS_ACTION_CODES
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F, Max, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from contextlib import contextmanager
+from contextvars import ContextVar
 import os
 
+DUPLICATE_ITEM_MESSAGE = (
+    'An MAS already exists for this Item in the selected Project. '
+    'Please submit a revision to the existing MAS instead of creating a new one.'
+)
+
+
+class RevisionConflict(Exception):
+    """Raised when a revision is submitted from an MAS that is no longer its chain's latest revision"""
+
+
+def is_duplicate_item_error(error, conflicts):
+    """
+    True when `error`, an IntegrityError raised while saving MAS, is a
+    unique_latest_mas_per_vendor_item violation. Backends that report the constraint are
+    matched by name. SQLite only lists the columns, so the check falls back to whether one
+    of the live MAS in `conflicts` now holds the item. Any other integrity error gives False.
+    """
+    if 'unique_latest_mas_per_vendor_item' in str(error):
+        return True
+    return conflicts.filter(is_latest=True).exists()
+
+
+# Project/Building counter column each MAS status is counted in (latest revisions only)
+MAS_STATUS_COUNTERS = {
+    'pending_review': 'mas_open_count',
+    'pending_approval': 'mas_open_count',
+    'revision_requested': 'mas_open_count',
+    'approved': 'mas_approved_count',
+    'rejected': 'mas_rejected_count',
+}
+
+
+def move_mas_counters(old=None, new=None, count=1):
+    """
+    Move `count` MAS between counters. `old` and `new` are (project_id, building_id, status)
+    tuples, or None for an MAS entering or leaving the counts. Each affected Project and
+    Building row gets a single F() update, and none when the counter does not change.
+    """
+    changes = {}
+    for state, sign in ((old, -count), (new, count)):
+        if state is None or state[2] not in MAS_STATUS_COUNTERS:
+            continue
+        project_id, building_id, status = state
+        field = MAS_STATUS_COUNTERS[status]
+        for model, pk in ((Project, project_id), (Building, building_id)):
+            deltas = changes.setdefault((model, pk), {})
+            deltas[field] = deltas.get(field, 0) + sign
+    for (model, pk), deltas in changes.items():
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if updates:
+            model.objects.filter(pk=pk).update(**updates)
+
+
+def rebuild_mas_counters(project_ids=None, building_ids=None):
+    """
+    Recompute Project and Building MAS counters from the latest revisions, one UPDATE per table.
+    Every row is recomputed unless ids are given, in which case only those rows are.
+    """
+    fields = sorted(set(MAS_STATUS_COUNTERS.values()))
+    targets = ((Project, 'project', project_ids), (Building, 'building', building_ids))
+    if project_ids is not None or building_ids is not None:
+        targets = [(model, fk, ids) for model, fk, ids in targets if ids]
+    for model, fk, ids in targets:
+        counts = {}
+        for field in fields:
+            statuses = [status for status, counter in MAS_STATUS_COUNTERS.items() if counter == field]
+            matching = (
+                MAS.objects.filter(**{fk: OuterRef('pk')}, is_latest=True, status__in=statuses)
+                .order_by().values(fk).annotate(n=Count('pk')).values('n')
+            )
+            counts[field] = Coalesce(Subquery(matching), 0)
+        rows = model.objects.all() if ids is None else model.objects.filter(pk__in=ids)
+        rows.update(**counts)
+
+
+# Activity log entries collected by buffered_activity_logs(), None when not buffering
+_activity_log_buffer = ContextVar('mas_activity_log_buffer', default=None)
+
+
+@contextmanager
+def buffered_activity_logs():
+    """
+    Collect the MAS.log_activity() entries and the MAS events made inside the block and insert
+    them with one bulk_create per table when it exits without an error. Run it inside the
+    transaction the logs belong to. Nested blocks join the outermost one.
+    A MAS_SAVED event is dropped when a later event of the block is about the same MAS, as
+    that event carries the newer state, so a workflow action writes one event, not two.
+    """
+    if _activity_log_buffer.get() is not None:
+        yield
+        return
+    buffer = []
+    token = _activity_log_buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _activity_log_buffer.reset(token)
+    superseded, seen = set(), set()
+    for row in reversed(buffer):
+        if isinstance(row, Event):
+            if row.code == EventCode.MAS_SAVED and row.subject_id in seen:
+                superseded.add(id(row))
+            seen.add(row.subject_id)
+    buffer = [row for row in buffer if id(row) not in superseded]
+    for model in (MASActivityLog, Event):
+        rows = [row for row in buffer if isinstance(row, model)]
+        if rows:
+            model.objects.bulk_create(rows)
+
+
+def _record(*rows):
+    """Insert activity log entries and events, or queue them inside buffered_activity_logs()"""
+    buffer = _activity_log_buffer.get()
+    if buffer is None:
+        with transaction.atomic():
+            for row in rows:
+                row.save()
+    else:
+        buffer.extend(rows)
+
+
 def mas_file_path(instance, filename):
     """
     Generate file path for MAS attachments
@@ -15,6 +140,45 @@ def mas_file_path(instance, filename):
     filename = f"{instance.mas_id}.{ext}"
     return os.path.join('mas_files', f'project_{instance.project.id}', filename)
 
+class MASChain(models.Model):
+    """
+    One row per MAS revision chain (an original MAS and all its revisions).
+    Every revision points at its chain, and the chain keeps its root, current head,
+    revision count and the head's status so chain-level lookups need no scan.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='mas_chains')
+    root = models.OneToOneField('MAS', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    head = models.OneToOneField('MAS', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    revision_count = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'MAS Chain'
+        verbose_name_plural = 'MAS Chains'
+
+    def __str__(self):
+        return f"Chain {self.pk} ({self.revision_count} revisions)"
+
+    @classmethod
+    def sync_heads(cls, chain_ids):
+        """
+        Point the given chains (ids or an id subquery) at their latest revision and refresh
+        the denormalised status and revision count with one UPDATE. Returns the rows updated.
+        """
+        latest = MAS.objects.filter(chain_id=OuterRef('pk'), is_latest=True).order_by('-revision')
+        count = (
+            MAS.objects.filter(chain_id=OuterRef('pk')).order_by()
+            .values('chain_id').annotate(n=Count('pk')).values('n')
+        )
+        return cls.objects.filter(pk__in=chain_ids).update(
+            head_id=Subquery(latest.values('pk')[:1]),
+            status=Coalesce(Subquery(latest.values('status')[:1]), models.Value('')),
+            revision_count=Coalesce(Subquery(count), 0),
+        )
+
+
 class MAS(models.Model):
     STATUS_CHOICES = [
         ('pending_review', 'Pending Review'),
@@ -25,7 +189,7 @@ class MAS(models.Model):
     ]
     
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
-    revision = models.CharField(max_length=5, default='R0', editable=False)
+    revision = models.PositiveSmallIntegerField(default=0, editable=False)  # Displayed as R<n>
     reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, 
                                on_delete=models.SET_NULL, 
                                null=True, blank=True,
@@ -50,6 +214,7 @@ class MAS(models.Model):
     serial_number = models.PositiveIntegerField(editable=False)
     
     # Revision tracking
+    chain = models.ForeignKey(MASChain, on_delete=models.CASCADE, null=True, blank=True, related_name='revisions')
     parent_mas = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='revisions')
     is_latest = models.BooleanField(default=True)  # Only the latest revision should be True
     
@@ -67,34 +232,132 @@ class MAS(models.Model):
         verbose_name = 'MAS'
         verbose_name_plural = 'MAS'
         ordering = ['-created_at']
+        indexes = [
+            # Backs the filtered/sorted MAS list (latest revisions only)
+            models.Index(fields=['is_latest', 'status', '-updated_at'], name='mas_latest_status_upd_idx'),
+            models.Index(fields=['-updated_at'], condition=Q(is_latest=True), name='mas_latest_updated_idx'),
+            models.Index(fields=['created_at'], name='mas_created_at_idx'),
+            # Chain lookups by MAS ID (revision history, latest head)
+            models.Index(fields=['mas_id', 'is_latest'], name='mas_masid_latest_idx'),
+            models.Index(fields=['chain', 'revision'], name='mas_chain_revision_idx'),
+            # Approved (project, item, make) lookup for the fast-track rule
+            models.Index(fields=['project', 'item', 'make', 'status'], name='mas_proj_item_make_idx'),
+            # Team MAS list: latest MAS of assigned buildings by status
+            models.Index(fields=['building', 'status'], condition=Q(is_latest=True), name='mas_latest_bldg_status_idx'),
+            # Vendor MAS list and dashboard: the vendor's latest MAS by status
+            models.Index(fields=['creator', 'status'], condition=Q(is_latest=True), name='mas_latest_creator_status_idx'),
+            # Serial allocation seed and duplicate-serial audits
+            models.Index(fields=['project', 'serial_number'], name='mas_project_serial_idx'),
+            # Analytics: approvals in a date window
+            models.Index(fields=['status', 'approval_date'], name='mas_status_approval_idx'),
+        ]
+        constraints = [
+            # A vendor holds at most one live MAS chain per item in a project; further changes are revisions
+            models.UniqueConstraint(
+                fields=['creator', 'project', 'item'],
+                condition=Q(is_latest=True),
+                name='unique_latest_mas_per_vendor_item',
+                violation_error_message=DUPLICATE_ITEM_MESSAGE,
+            ),
+        ]
+    
+    # (project_id, building_id, status) this MAS is counted under in the database, see move_mas_counters
+    _counted_state = None
+    _COUNTER_FIELDS = {'project_id', 'building_id', 'status', 'is_latest'}
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls._COUNTER_FIELDS.issubset(field_names):
+            instance._counted_state = instance._counter_state()
+        else:
+            # Deferred load: look the stored state up only if it is needed
+            instance._counted_state = Ellipsis
+        return instance
+    
+    def _counter_state(self):
+        if not self.is_latest:
+            return None
+        return (self.project_id, self.building_id, self.status)
+    
+    def _stored_counter_state(self):
+        if self._counted_state is Ellipsis:
+            row = MAS.objects.filter(pk=self.pk, is_latest=True).values_list('project_id', 'building_id', 'status')
+            self._counted_state = row.first()
+        return self._counted_state
     
     def save(self, *args, **kwargs):
-        if not self.serial_number:
-            # Get the latest serial number for this project
-            last_mas = MAS.objects.filter(project=self.project).order_by('-serial_number').first()
-            self.serial_number = (last_mas.serial_number + 1) if last_mas else 1
-        
-        if not self.mas_id:
-            # Generate MAS ID in format: "Project Number"-"Building"-MAS-"Service"-"Serial Number"
-            self.mas_id = f"{self.project.project_number}-{self.building.name}-MAS-{self.service.name}-{self.serial_number}"
-        
-        # When saving a new revision, mark previous versions as not latest
-        if self.pk is None and self.parent_mas:
-            MAS.objects.filter(
-                mas_id=self.mas_id, 
-                is_latest=True
-            ).update(is_latest=False)
-        
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if not self.serial_number:
+                self.serial_number = MASSerialCounter.reserve(self.project_id)
+            
+            if not self.mas_id:
+                self.mas_id = self.build_mas_id()
+            
+            is_new = self.pk is None
+            counted = None if is_new else self._stored_counter_state()
+            new_chain = is_new and self.chain_id is None
+            if new_chain:
+                self.chain = MASChain.objects.create(project_id=self.project_id, status=self.status)
+            
+            super().save(*args, **kwargs)
+            
+            # Keep the chain's head and status in step with its latest revision
+            if self.is_latest and self.chain_id:
+                chain_fields = {'status': self.status, 'updated_at': timezone.now()}
+                if new_chain:
+                    chain_fields.update(root=self, head=self)
+                elif is_new:
+                    chain_fields.update(head=self, revision_count=F('revision_count') + 1)
+                MASChain.objects.filter(pk=self.chain_id).update(**chain_fields)
+            
+            state = self._counter_state()
+            if state != counted:
+                move_mas_counters(counted, state)
+                self._counted_state = state
+            
+            from .search import index_mas
+            index_mas([self.pk])
+            _record(self.event(EventCode.MAS_SAVED))
+    
+    def delete(self, *args, **kwargs):
+        from .search import unindex_mas
+        with transaction.atomic():
+            move_mas_counters(old=self._stored_counter_state())
+            self._counted_state = None
+            unindex_mas([self.pk])
+            _record(self.event(EventCode.MAS_DELETED))
+            return super().delete(*args, **kwargs)
     
     def __str__(self):
-        return f"{self.mas_id} ({self.revision})"
+        return f"{self.mas_id} ({self.revision_label})"
+    
+    @property
+    def revision_label(self):
+        """Display label for the revision number, e.g. R3"""
+        return f"R{self.revision}"
+    
+    def build_mas_id(self):
+        """Generate MAS ID in format: Project Number-Building-MAS-Service-Serial Number"""
+        return f"{self.project.project_number}-{self.building.name}-MAS-{self.service.name}-{self.serial_number}"
+    
+    def is_duplicate_item_error(self, error):
+        """True when `error` from saving this MAS means another live MAS chain holds its item"""
+        conflicts = MAS.objects.filter(creator_id=self.creator_id, project_id=self.project_id, item_id=self.item_id)
+        if self.pk:
+            conflicts = conflicts.exclude(pk=self.pk)
+        if self.chain_id:
+            # A failed revision leaves its chain's previous head live again
+            conflicts = conflicts.exclude(chain_id=self.chain_id)
+        return is_duplicate_item_error(error, conflicts)
     
     def can_edit(self):
         return self.status == 'pending_review' and self.is_latest
     
     def get_revision_history(self):
         """Get all revisions of this MAS in chronological order"""
+        if self.chain_id:
+            return MAS.objects.filter(chain_id=self.chain_id).order_by('revision')
         if self.parent_mas:
             # If this is a revision, get the original and all its revisions
             return MAS.objects.filter(
@@ -104,16 +367,224 @@ class MAS(models.Model):
             # If this is the original, get it and all its revisions
             return MAS.objects.filter(mas_id=self.mas_id).order_by('created_at')
     
-    def log_activity(self, action, user, details=''):
-        """Helper method to log activity"""
-        MASActivityLog.objects.create(
-            mas=self,
-            action=action,
-            user=user,
-            details=details
+    def create_revision(self, revision, user):
+        """
+        Save `revision` (an unsaved MAS) as the new head of this MAS's chain and log it.
+        The previous head is flipped by primary key and the new head and its log entry are
+        written in the same transaction. Raises RevisionConflict if this MAS is no longer
+        the latest revision (e.g. another revision was submitted concurrently).
+        """
+        with transaction.atomic():
+            counted = self._stored_counter_state()
+            if not MAS.objects.filter(pk=self.pk, is_latest=True).update(is_latest=False):
+                raise RevisionConflict(f'{self.mas_id} {self.revision_label} is no longer the latest revision.')
+            self.is_latest = False
+            move_mas_counters(old=counted)
+            self._counted_state = None
+            
+            revision.mas_id = self.mas_id
+            revision.chain_id = self.chain_id
+            revision.serial_number = self.serial_number
+            revision.revision = self.revision + 1
+            revision.parent_mas_id = self.parent_mas_id or self.pk
+            revision.is_latest = True
+            revision.status = 'pending_review'
+            revision.save()
+            revision.log_activity('revision_submitted', user, f'Revision {revision.revision_label} submitted')
+        return revision
+    
+    def get_fast_track_precedent(self):
+        """
+        Return an approved MAS for the same project, item and make, if any.
+        A match lets the project's fast-track rule route this MAS past review.
+        """
+        return MAS.objects.filter(
+            project_id=self.project_id,
+            item_id=self.item_id,
+            make=self.make,
+            status='approved',
+        ).exclude(pk=self.pk).order_by('-approval_date').first()
+    
+    def apply_fast_track(self, precedent=None):
+        """
+        Apply the project's fast-track rule to an unsaved MAS.
+        Callers that already looked up the approved precedent can pass it in.
+        Returns the approved precedent MAS when the rule fired, otherwise None.
+        """
+        mode = self.project.mas_fast_track
+        if not mode:
+            return None
+        if precedent is None:
+            precedent = self.get_fast_track_precedent()
+        if precedent is None:
+            return None
+        if mode == 'auto_approve':
+            self.status = 'approved'
+            self.approval_date = timezone.now()
+            self.approval_comment = f'Auto-approved by fast-track rule (same item/make approved in {precedent.mas_id})'
+        else:
+            self.status = 'pending_approval'
+            self.review_date = timezone.now()
+            self.review_comment = f'Review skipped by fast-track rule (same item/make approved in {precedent.mas_id})'
+        return precedent
+    
+    def log_activity(self, action, user, details='', **snapshot):
+        """
+        Helper method to log activity. Inside buffered_activity_logs() the entry is queued
+        for the block's bulk insert, otherwise it is inserted right away.
+        `snapshot` can override the snapshot fields, see MASActivityLog.from_mas.
+        """
+        log = MASActivityLog.from_mas(self, action, user, details, **snapshot)
+        _record(log, self.activity_event(action, user, details, timestamp=log.timestamp))
+        return log
+    
+    def activity_event(self, action, user, details='', timestamp=None):
+        """Unsaved event-store record of a workflow action on this MAS"""
+        return self.event(MAS_ACTION_CODES[action], user, details, timestamp)
+    
+    def event(self, code, user=None, details='', timestamp=None):
+        """Unsaved event-store record with code `code` about this MAS"""
+        return Event(
+            code=code,
+            timestamp=timestamp or timezone.now(),
+            actor=user,
+            project_id=self.project_id,
+            building_id=self.building_id,
+            subject_id=self.pk,
+            payload={
+                'mas_id': self.mas_id,
+                'chain_id': self.chain_id,
+                'revision': self.revision,
+                'parent_mas_id': self.parent_mas_id,
+                'status': self.status,
+                'is_latest': self.is_latest,
+                'service_id': self.service_id,
+                'item_id': self.item_id,
+                'creator_id': self.creator_id,
+                'make': self.make,
+                'details': details,
+            },
         )
 
 
+class MASSearchTerm(models.Model):
+    """
+    Inverted index for MAS search on databases without SQLite FTS5: one row per
+    (term, MAS) with the weight of the most important field the term appears in
+    """
+    term = models.CharField(max_length=100)
+    mas = models.ForeignKey(MAS, on_delete=models.CASCADE, related_name='+')
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        verbose_name = 'MAS Search Term'
+        verbose_name_plural = 'MAS Search Terms'
+        indexes = [
+            models.Index(fields=['term', 'mas'], name='massearchterm_term_mas_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.mas_id}"
+
+
+class MASChainState(models.Model):
+    """
+    Read model folded from the MAS event stream by the mas_chains projection: each revision
+    chain's head as the events describe it. Live pages keep reading MASChain, which MAS.save()
+    maintains; this table can be rebuilt offline from the events and compared with it.
+    """
+    chain_id = models.BigIntegerField(primary_key=True)
+    head_id = models.BigIntegerField()
+    project_id = models.BigIntegerField()
+    building_id = models.BigIntegerField()
+    status = models.CharField(max_length=20)
+    revision = models.PositiveIntegerField(default=0)
+    revision_count = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"Chain {self.chain_id} -> {self.head_id} ({self.status})"
+
+
+class MASStatusCount(models.Model):
+    """
+    Read model folded from the MAS event stream by the mas_chains projection: latest-revision
+    MAS per project, building and counter (see MAS_STATUS_COUNTERS).
+    """
+    project_id = models.BigIntegerField()
+    building_id = models.BigIntegerField()
+    counter = models.CharField(max_length=30)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project_id', 'building_id', 'counter'], name='unique_mas_status_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.counter} for building {self.building_id}: {self.count}"
+
+
+class MASSerialCounter(models.Model):
+    """
+    Last MAS serial number handed out per project.
+    Serials are reserved by an atomic increment of this row, so concurrent creates never collide.
+    """
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='mas_serial_counter')
+    last_serial = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'MAS Serial Counter'
+        verbose_name_plural = 'MAS Serial Counters'
+
+    def __str__(self):
+        return f"{self.project} - {self.last_serial}"
+
+    @classmethod
+    def reserve(cls, project_id, count=1):
+        """
+        Reserve `count` consecutive serial numbers for a project and return the first one.
+        Runs inside the caller's transaction when there is one.
+        """
+        with transaction.atomic():
+            updated = cls.objects.filter(project_id=project_id).update(last_serial=F('last_serial') + count)
+            if not updated:
+                # First allocation for this project: seed from any MAS created before counters existed
+                seed = MAS.objects.filter(project_id=project_id).aggregate(last=Max('serial_number'))['last'] or 0
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(project_id=project_id, last_serial=seed + count)
+                except IntegrityError:
+                    # Another request created the counter first
+                    cls.objects.filter(project_id=project_id).update(last_serial=F('last_serial') + count)
+            last_serial = cls.objects.filter(project_id=project_id).values_list('last_serial', flat=True).get()
+        return last_serial - count + 1
+
+
+class SavedMASView(models.Model):
+    """
+    A named set of MAS list filters saved by a user so it can be re-applied later
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_mas_views')
+    name = models.CharField(max_length=100)
+    # Filter spec as submitted to mas_list, e.g. {"status": "approved", "project": "3", "sort": "-updated_at"}
+    filters = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        unique_together = ['user', 'name']
+        verbose_name = 'Saved MAS View'
+        verbose_name_plural = 'Saved MAS Views'
+
+    def __str__(self):
+        return f"{self.name} ({self.user})"
+
+    def as_querystring(self):
+        """Return the saved filters encoded as a mas_list query string"""
+        from django.utils.http import urlencode
+        return urlencode({k: v for k, v in self.filters.items() if v})
+
+
 class MASActivityLog(models.Model):
     """
     Logs all activities related to MAS (create, edit, review, approve, reject, etc.)
@@ -128,6 +599,7 @@ class MASActivityLog(models.Model):
         ('rejected', 'Rejected'),
         ('revision_requested', 'Revision Requested'),
         ('revision_submitted', 'Revision Submitted'),
+        ('fast_tracked', 'Fast-tracked'),
     ]
     
     mas = models.ForeignKey(MAS, on_delete=models.CASCADE, related_name='activity_logs')
@@ -150,6 +622,37 @@ class MASActivityLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'MAS Activity Log'
         verbose_name_plural = 'MAS Activity Logs'
+        indexes = [
+            # MAS history, newest first, keyset-paginated on (timestamp, id)
+            models.Index(fields=['-timestamp', '-id'], name='maslog_timestamp_id_idx'),
+            # Per-MAS timelines
+            models.Index(fields=['mas', 'timestamp'], name='maslog_mas_timestamp_idx'),
+        ]
+    
+    @staticmethod
+    def snapshot(mas, **overrides):
+        """
+        Snapshot field values for `mas`. Names are read from `overrides` or from the MAS's
+        related objects, which cost no query when already loaded (e.g. via select_related).
+        """
+        values = {'make': mas.make, 'status': mas.status}
+        for relation in ('project', 'building', 'service', 'item'):
+            key = f'{relation}_name'
+            values[key] = overrides[key] if key in overrides else getattr(mas, relation).name
+        values.update(overrides)
+        return values
+    
+    @classmethod
+    def from_mas(cls, mas, action, user=None, details='', **overrides):
+        """Build an unsaved log entry for `mas` with its username and MAS snapshot filled in"""
+        return cls(
+            mas=mas,
+            action=action,
+            user=user,
+            username=user.username if user else '',
+            details=details,
+            **cls.snapshot(mas, **overrides)
+        )
     
     def save(self, *args, **kwargs):
         # Capture username snapshot if available
@@ -157,12 +660,8 @@ class MASActivityLog(models.Model):
             self.username = self.user.username
         # Capture snapshot of MAS data if not already set
         if not self.project_name and self.mas:
-            self.project_name = self.mas.project.name
-            self.building_name = self.mas.building.name
-            self.service_name = self.mas.service.name
-            self.item_name = self.mas.item.name
-            self.make = self.mas.make
-            self.status = self.mas.status
+            for field, value in self.snapshot(self.mas).items():
+                setattr(self, field, value)
         super().save(*args, **kwargs)
     
     def __str__(self):
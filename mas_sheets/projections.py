@@ -0,0 +1,110 @@
+"""
+Event-store projections for MAS read models.
+
+mas_chains folds the MAS events themselves: each event's payload (chain, revision, status,
+is_latest) moves its chain's head in MASChainState and its counter in MASStatusCount, so
+both tables are rebuilt from the event stream alone by replaying it from zero.
+
+mas_search indexes the current document of every MAS an event names. Documents hold names
+and comments that the payloads do not carry, so it is not replayed: a rebuild reindexes
+the MAS table in the transaction that moves its checkpoint to the latest event.
+"""
+from collections import Counter
+
+from events.models import EventCode, MAS_EVENT_CODES
+from events.projections import Projection, register
+
+from .models import MAS_STATUS_COUNTERS, MASChainState, MASStatusCount
+from .search import index_mas, rebuild_index
+
+
+@register
+class MASChainProjection(Projection):
+    """Chain heads and latest-revision counters per project/building, folded from MAS events"""
+    name = 'mas_chains'
+    codes = MAS_EVENT_CODES
+
+    def reset(self):
+        MASChainState.objects.all().delete()
+        MASStatusCount.objects.all().delete()
+
+    def apply(self, events):
+        chain_ids = {event.payload.get('chain_id') for event in events} - {None}
+        states = MASChainState.objects.in_bulk(chain_ids)
+        existing = set(states)
+        deleted = set()
+        deltas = Counter()
+
+        def count(state, sign):
+            counter = MAS_STATUS_COUNTERS.get(state.status)
+            if counter:
+                deltas[(state.project_id, state.building_id, counter)] += sign
+
+        for event in events:
+            chain_id = event.payload.get('chain_id')
+            if chain_id is None:
+                continue
+            state = states.get(chain_id)
+            if event.code == EventCode.MAS_DELETED:
+                # Deleting the head leaves the chain without a latest revision
+                if state and state.head_id == event.subject_id:
+                    count(state, -1)
+                    del states[chain_id]
+                    deleted.add(chain_id)
+                continue
+            revision = event.payload.get('revision', 0)
+            if not event.payload.get('is_latest', True) or state and revision < state.revision:
+                # About a revision that has been superseded
+                continue
+            if state is None:
+                state = states[chain_id] = MASChainState(chain_id=chain_id, revision=revision)
+                deleted.discard(chain_id)
+            else:
+                count(state, -1)
+                if revision > state.revision:
+                    state.revision_count += 1
+            state.head_id = event.subject_id
+            state.project_id = event.project_id
+            state.building_id = event.building_id
+            state.status = event.payload.get('status', '')
+            state.revision = revision
+            count(state, 1)
+
+        MASChainState.objects.filter(pk__in=deleted).delete()
+        MASChainState.objects.bulk_create([state for pk, state in states.items() if pk not in existing])
+        MASChainState.objects.bulk_update(
+            [state for pk, state in states.items() if pk in existing],
+            ['head_id', 'project_id', 'building_id', 'status', 'revision', 'revision_count'],
+        )
+        self._add_counts(deltas)
+
+    def _add_counts(self, deltas):
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        rows = {
+            (row.project_id, row.building_id, row.counter): row
+            for row in MASStatusCount.objects.filter(building_id__in={key[1] for key in deltas})
+        }
+        for key, delta in deltas.items():
+            if key in rows:
+                rows[key].count += delta
+        MASStatusCount.objects.bulk_update([rows[key] for key in deltas if key in rows], ['count'])
+        MASStatusCount.objects.bulk_create([
+            MASStatusCount(project_id=key[0], building_id=key[1], counter=key[2], count=delta)
+            for key, delta in deltas.items() if key not in rows
+        ])
+
+
+@register
+class MASSearchProjection(Projection):
+    """Full-text search index"""
+    name = 'mas_search'
+    codes = MAS_EVENT_CODES
+    replay = False
+
+    def reset(self):
+        rebuild_index()
+
+    def apply(self, events):
+        index_mas(sorted({event.subject_id for event in events}))
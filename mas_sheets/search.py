@@ -0,0 +1,206 @@
+"""
+Full-text search over MAS: MAS ID, make, item, project, building, vendor and review/approval comments.
+
+On SQLite the index is an FTS5 virtual table (rowid = MAS pk) ranked with bm25. On other
+backends, or a SQLite build without FTS5, it falls back to the MASSearchTerm inverted index.
+Rows are re-indexed whenever an MAS is saved; renames of projects, buildings, items or users
+are picked up by the rebuild_mas_search command.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import Case, IntegerField, Max, Q, Sum, When
+
+from accounts.models import CustomUser
+from projects.models import Building, Project
+from services.models import Item
+from .models import MAS, MASSearchTerm
+
+FTS_TABLE = 'mas_sheets_mas_fts'
+# Relative weight of each indexed column, in FTS column order
+FIELD_WEIGHTS = {
+    'mas_id': 10,
+    'make': 4,
+    'item': 4,
+    'project': 2,
+    'building': 2,
+    'vendor': 2,
+    'comments': 1,
+}
+MAX_TERM_LENGTH = 100
+
+
+def fts_enabled():
+    """
+    True when the FTS5 index is in use for the default database. Looked up once per database
+    connection, and again after migrations, so a check made before the FTS table existed
+    does not stick.
+    """
+    enabled = getattr(connection, 'mas_fts_enabled', None)
+    if enabled is None:
+        enabled = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+        connection.mas_fts_enabled = enabled
+    return enabled
+
+
+def reset_fts_enabled(sender=None, connection=None, using=None, **kwargs):
+    """connection_created / post_migrate receiver forgetting the connection's fts_enabled() answer"""
+    if connection is None:
+        connection = connections[using]
+    connection.mas_fts_enabled = None
+
+
+def tokenize(text):
+    """Lower-cased word tokens of `text`, the unit both indexes match on"""
+    return [token[:MAX_TERM_LENGTH] for token in re.findall(r'\w+', (text or '').lower())]
+
+
+def _document_sql(where=''):
+    """SELECT producing one search document per MAS, optionally restricted by `where`"""
+    q = connection.ops.quote_name
+    return f"""
+        SELECT m.id, m.mas_id,
+               m.make || ' ' || COALESCE(m.other_make, ''),
+               i.name,
+               p.name || ' ' || p.project_number,
+               b.name,
+               u.username || ' ' || u.first_name || ' ' || u.last_name,
+               m.review_comment || ' ' || m.approval_comment,
+               m.building_id, m.creator_id
+        FROM {q(MAS._meta.db_table)} m
+        JOIN {q(Item._meta.db_table)} i ON i.id = m.item_id
+        JOIN {q(Project._meta.db_table)} p ON p.id = m.project_id
+        JOIN {q(Building._meta.db_table)} b ON b.id = m.building_id
+        JOIN {q(CustomUser._meta.db_table)} u ON u.id = m.creator_id
+        {where}
+    """
+
+
+def index_mas(pks):
+    """(Re)index the given MAS primary keys with a fixed number of statements"""
+    pks = [pk for pk in pks if pk]
+    if not pks:
+        return
+    placeholders = ', '.join(['%s'] * len(pks))
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', pks)
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FIELD_WEIGHTS)}, building_id, creator_id) '
+                + _document_sql(f'WHERE m.id IN ({placeholders})'),
+                pks,
+            )
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(_document_sql(f'WHERE m.id IN ({placeholders})'), pks)
+        rows = cursor.fetchall()
+    MASSearchTerm.objects.filter(mas_id__in=pks).delete()
+    MASSearchTerm.objects.bulk_create(_terms(rows), batch_size=1000)
+
+
+def unindex_mas(pks):
+    """Drop the given MAS from the FTS index (inverted-index rows cascade with the MAS)"""
+    if pks and fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(pks))})', list(pks)
+            )
+
+
+def _terms(rows):
+    """MASSearchTerm rows for document rows, one per (term, MAS) carrying its best field weight"""
+    for row in rows:
+        weights = {}
+        for weight, text in zip(FIELD_WEIGHTS.values(), row[1:len(FIELD_WEIGHTS) + 1]):
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0), weight)
+        for term, weight in weights.items():
+            yield MASSearchTerm(term=term, mas_id=row[0], weight=weight)
+
+
+def clear_index():
+    """Empty the search index"""
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    else:
+        MASSearchTerm.objects.all().delete()
+
+
+def rebuild_index(batch_size=5000):
+    """Rebuild the whole search index from the MAS table. Returns the number of MAS indexed."""
+    total = MAS.objects.count()
+    clear_index()
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FIELD_WEIGHTS)}, building_id, creator_id) '
+                + _document_sql()
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        return total
+
+    last_pk = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(_document_sql('WHERE m.id > %s ORDER BY m.id LIMIT %s'), [last_pk, batch_size])
+            rows = cursor.fetchall()
+        if not rows:
+            break
+        MASSearchTerm.objects.bulk_create(_terms(rows), batch_size=1000)
+        last_pk = rows[-1][0]
+    return total
+
+
+def search_mas(query, building_ids=None, creator_id=None, limit=50):
+    """
+    Return up to `limit` (mas_pk, score) pairs best matching `query`, best first.
+    Every query token must match (the last one as a prefix, for search-as-you-type). Only
+    latest revisions are returned; superseded ones stay in the index and are filtered out.
+    `building_ids` / `creator_id` restrict results to what a Team member or Vendor can see.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens or building_ids is not None and not building_ids:
+        return []
+
+    if fts_enabled():
+        match = ' '.join(f'"{token}"' for token in tokens[:-1]) + f' "{tokens[-1]}"*'
+        sql = (
+            f'SELECT m.id, bm25({FTS_TABLE}, {", ".join(str(w) for w in FIELD_WEIGHTS.values())}) AS score '
+            f'FROM {FTS_TABLE} JOIN {connection.ops.quote_name(MAS._meta.db_table)} m ON m.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND m.is_latest = %s'
+        )
+        params = [match.strip(), True]
+        if building_ids is not None:
+            sql += f' AND m.building_id IN ({", ".join(["%s"] * len(building_ids))})'
+            params += list(building_ids)
+        if creator_id is not None:
+            sql += ' AND m.creator_id = %s'
+            params.append(creator_id)
+        sql += ' ORDER BY score LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25 scores are negative, lower is better
+            return [(pk, -score) for pk, score in cursor.fetchall()]
+
+    # Every token matches its own term range: exact for all but the last, a prefix for the last
+    token_matches = [Q(term=token) for token in tokens[:-1]]
+    token_matches.append(Q(term__gte=tokens[-1], term__lt=tokens[-1] + '\uffff'))
+    terms = MASSearchTerm.objects.filter(Q.create(token_matches, connector=Q.OR), mas__is_latest=True)
+    if building_ids is not None:
+        terms = terms.filter(mas__building_id__in=building_ids)
+    if creator_id is not None:
+        terms = terms.filter(mas__creator_id=creator_id)
+    hits = {
+        f'hit_{n}': Max(Case(When(match, then=1), default=0, output_field=IntegerField()))
+        for n, match in enumerate(token_matches)
+    }
+    ranked = (
+        terms.values('mas_id').annotate(score=Sum('weight'), **hits)
+        .filter(**{name: 1 for name in hits})
+        .order_by('-score', '-mas_id')
+        .values_list('mas_id', 'score')[:limit]
+    )
+    return list(ranked)
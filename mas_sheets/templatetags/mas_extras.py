@@ -32,3 +32,10 @@ def is_reviewer_for_building(user, building):
         building=building,
         role='Reviewer'
     ).exists()
+
+@register.simple_tag
+def next_sort(current, field):
+    """Return the sort value for a column header: toggles direction if already sorted by field."""
+    if current == field:
+        return f'-{field}'
+    return field
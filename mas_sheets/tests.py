@@ -1,3 +1,804 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projects.models import Building, BuildingRole, Project, ProjectVendor
+from services.models import Item, Service
+
+from . import archive, search, views
+from .history_options import MAS_ID_SUGGESTIONS_LIMIT, _mas_id_suggestion_queryset, options_version
+from .models import (
+    DUPLICATE_ITEM_MESSAGE, MAS, MASActivityLog, MASChain, MASSerialCounter, RevisionConflict, SavedMASView,
+    buffered_activity_logs, move_mas_counters,
+)
+from .search import search_mas
+
+User = get_user_model()
+
+# Tests never share a cache with a running instance, whatever the settings say
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'mas-tests'}}
+
+
+class MASTestMixin:
+    """Shared fixtures: one project/building/service, a vendor and a reviewer/approver"""
+
+    def setUp(self):
+        self.enterContext(override_settings(CACHES=TEST_CACHES))
+        cache.clear()
+        self.vendor = User.objects.create_user(username='vendor', password='pass', user_type='Vendor')
+        self.reviewer = User.objects.create_user(username='reviewer', password='pass', user_type='Team')
+        self.approver = User.objects.create_user(username='approver', password='pass', user_type='Team')
+
+        self.project = Project.objects.create(name='Tower', project_number='P100')
+        self.building = Building.objects.create(project=self.project, name='B1')
+        self.service = Service.objects.create(name='HVAC')
+        self.items = [Item.objects.create(service=self.service, name=f'Item {i}') for i in range(3)]
+
+        ProjectVendor.objects.create(project=self.project, user=self.vendor, building=self.building)
+        BuildingRole.objects.create(building=self.building, user=self.reviewer, role='Reviewer')
+        BuildingRole.objects.create(building=self.building, user=self.approver, role='Approver')
+
+    def make_mas(self, item, make='Acme', **kwargs):
+        return MAS.objects.create(
+            project=self.project,
+            building=self.building,
+            service=self.service,
+            item=item,
+            make=make,
+            attachment='mas_files/test.pdf',
+            creator=kwargs.pop('creator', self.vendor),
+            **kwargs
+        )
+
+
+class MASListTests(MASTestMixin, TestCase):
+    def test_filters_sort_and_paginate(self):
+        for item, make in zip(self.items, ['Zeta', 'Alpha', 'Mid']):
+            self.make_mas(item, make=make)
+        self.client.force_login(self.vendor)
+
+        resp = self.client.get(reverse('mas_sheets:mas_list'), {'status': 'pending', 'sort': 'make'})
+        self.assertEqual([m.make for m in resp.context['mas_list']], ['Alpha', 'Mid', 'Zeta'])
+
+        resp = self.client.get(reverse('mas_sheets:mas_list'), {'status': 'pending', 'item': self.items[0].pk})
+        self.assertEqual([m.item_id for m in resp.context['mas_list']], [self.items[0].pk])
+        self.assertEqual(resp.context['page_obj'].paginator.count, 1)
+
+    def test_save_and_delete_view(self):
+        self.client.force_login(self.vendor)
+        resp = self.client.post(reverse('mas_sheets:mas_list_view_save'), {
+            'name': 'Approved HVAC', 'status': 'approved', 'service': self.service.pk,
+        })
+        view = SavedMASView.objects.get(user=self.vendor, name='Approved HVAC')
+        self.assertEqual(view.filters, {'status': 'approved', 'service': str(self.service.pk)})
+        self.assertRedirects(resp, f"{reverse('mas_sheets:mas_list')}?{view.as_querystring()}")
+
+        self.client.post(reverse('mas_sheets:mas_list_view_delete', args=[view.pk]))
+        self.assertFalse(SavedMASView.objects.filter(pk=view.pk).exists())
+
+    def test_fragment_request_renders_table_only(self):
+        self.make_mas(self.items[0])
+        self.client.force_login(self.vendor)
+
+        resp = self.client.get(reverse('mas_sheets:mas_list'), {'status': 'pending'},
+                               headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertTemplateUsed(resp, 'mas_sheets/partials/mas_list_table.html')
+        self.assertTemplateNotUsed(resp, 'base.html')
+        self.assertNotIn('filter_options', resp.context)
+
+        resp = self.client.get(reverse('mas_sheets:mas_history'), {'fragment': 'table'})
+        self.assertTemplateUsed(resp, 'mas_sheets/partials/mas_history_table.html')
+        self.assertTemplateNotUsed(resp, 'base.html')
+
+
+class FastTrackTests(MASTestMixin, TestCase):
+    def test_rule_off_by_default(self):
+        self.make_mas(self.items[0], status='approved')
+        mas = MAS(project=self.project, building=self.building, service=self.service,
+                  item=self.items[0], make='Acme', creator=self.vendor)
+        self.assertIsNone(mas.apply_fast_track())
+        self.assertEqual(mas.status, 'pending_review')
+
+    def test_skip_review_and_auto_approve(self):
+        precedent = self.make_mas(self.items[0], status='approved')
+        self.project.mas_fast_track = 'skip_review'
+        self.project.save()
+
+        mas = MAS(project=self.project, building=self.building, service=self.service,
+                  item=self.items[0], make='Acme', creator=self.vendor)
+        self.assertEqual(mas.apply_fast_track(), precedent)
+        self.assertEqual(mas.status, 'pending_approval')
+
+        self.project.mas_fast_track = 'auto_approve'
+        mas = MAS(project=self.project, building=self.building, service=self.service,
+                  item=self.items[0], make='Acme', creator=self.vendor)
+        mas.apply_fast_track()
+        self.assertEqual(mas.status, 'approved')
+
+        # A different make is genuinely new and goes through review
+        mas = MAS(project=self.project, building=self.building, service=self.service,
+                  item=self.items[0], make='Other Co', creator=self.vendor)
+        self.assertIsNone(mas.apply_fast_track())
+
+
+class MASBatchCreateTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.client.force_login(self.vendor)
+
+    def post_batch(self, csv_text, filenames):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            return self.client.post(reverse('mas_sheets:mas_batch_create'), {
+                'project': self.project.pk,
+                'building': self.building.pk,
+                'service': self.service.pk,
+                'csv_file': SimpleUploadedFile('batch.csv', csv_text.encode(), content_type='text/csv'),
+                'attachments': [SimpleUploadedFile(name, b'%PDF-1.4', content_type='application/pdf') for name in filenames],
+            })
+
+    def test_batch_creates_mas_with_serials_and_logs(self):
+        self.make_mas(self.items[2])  # serial 1
+        resp = self.post_batch('item,make,attachment\nItem 0,Acme,a.pdf\nItem 1,Other Co,b.pdf\n', ['a.pdf', 'b.pdf'])
+        self.assertRedirects(resp, reverse('mas_sheets:mas_list'))
+
+        created = MAS.objects.filter(item__in=self.items[:2]).order_by('serial_number')
+        self.assertEqual([m.serial_number for m in created], [2, 3])
+        self.assertEqual(created[0].mas_id, 'P100-B1-MAS-HVAC-2')
+        self.assertEqual(MASActivityLog.objects.filter(mas__in=created, action='created').count(), 2)
+        self.assertEqual(MASActivityLog.objects.get(mas=created[1]).item_name, 'Item 1')
+        self.assertEqual([m.chain.head_id for m in created], [m.pk for m in created])
+
+    def test_blocked_item_rejects_whole_batch(self):
+        self.make_mas(self.items[0])
+        resp = self.post_batch('item,make,attachment\nItem 0,Acme,a.pdf\nItem 1,Acme,b.pdf\n', ['a.pdf', 'b.pdf'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('Row 2', resp.context['form'].non_field_errors()[0])
+        self.assertFalse(MAS.objects.filter(item=self.items[1]).exists())
+
+    def test_only_duplicate_item_violations_become_form_errors(self):
+        from .forms import MASBatchForm
+        csv_text = 'item,make,attachment\nItem 0,Acme,a.pdf\n'
+
+        def racing_save(form):
+            # Another submission takes the item between validation and insert
+            self.make_mas(self.items[0])
+            raise IntegrityError('UNIQUE constraint failed: mas_sheets_mas.creator_id')
+
+        with mock.patch.object(MASBatchForm, 'save', racing_save):
+            resp = self.post_batch(csv_text, ['a.pdf'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(DUPLICATE_ITEM_MESSAGE, resp.context['form'].non_field_errors())
+
+        MAS.objects.all().delete()
+        with mock.patch.object(MASBatchForm, 'save', side_effect=IntegrityError('FOREIGN KEY constraint failed')):
+            with self.assertRaises(IntegrityError):
+                self.post_batch(csv_text, ['a.pdf'])
+
+
+class MASSerialCounterTests(MASTestMixin, TestCase):
+    def test_reserve_seeds_from_existing_and_allocates_ranges(self):
+        MAS.objects.create(project=self.project, building=self.building, service=self.service, item=self.items[0],
+                           make='Acme', attachment='mas_files/test.pdf', creator=self.vendor, serial_number=7)
+        self.assertEqual(MASSerialCounter.reserve(self.project.pk), 8)
+        self.assertEqual(MASSerialCounter.reserve(self.project.pk, 5), 9)
+        self.assertEqual(self.make_mas(self.items[1]).serial_number, 14)
+
+
+class MASRevisionTests(MASTestMixin, TestCase):
+    def new_revision(self, head):
+        return MAS(project=head.project, building=head.building, service=head.service, item=head.item,
+                   make='Acme v2', attachment='mas_files/test.pdf', creator=self.vendor)
+
+    def test_create_revision_flips_head_and_logs(self):
+        original = self.make_mas(self.items[0], status='rejected')
+        rev = original.create_revision(self.new_revision(original), self.vendor)
+
+        original.refresh_from_db()
+        self.assertFalse(original.is_latest)
+        self.assertEqual((rev.mas_id, rev.revision, rev.parent_mas_id), (original.mas_id, 1, original.pk))
+        self.assertTrue(MASActivityLog.objects.filter(mas=rev, action='revision_submitted').exists())
+
+        rev2 = rev.create_revision(self.new_revision(rev), self.vendor)
+        self.assertEqual((rev2.revision, rev2.parent_mas_id), (2, original.pk))
+        self.assertEqual(MAS.objects.filter(mas_id=original.mas_id, is_latest=True).get(), rev2)
+
+        chain = MASChain.objects.get(pk=original.chain_id)
+        self.assertEqual((chain.root_id, chain.head_id, chain.revision_count, chain.status),
+                         (original.pk, rev2.pk, 3, 'pending_review'))
+        self.assertEqual(list(rev2.get_revision_history()), [original, rev, rev2])
+
+    def test_one_latest_mas_per_vendor_project_item(self):
+        original = self.make_mas(self.items[0], status='rejected')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_mas(self.items[0])
+        # Another vendor, or a revision of the same chain, is fine
+        other_vendor = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.make_mas(self.items[0], creator=other_vendor)
+        original.create_revision(self.new_revision(original), self.vendor)
+
+    def test_duplicate_item_error_detection(self):
+        original = self.make_mas(self.items[0])
+        duplicate = MAS(project=self.project, building=self.building, service=self.service, item=self.items[0],
+                        make='Acme', attachment='mas_files/test.pdf', creator=self.vendor)
+        with self.assertRaises(IntegrityError) as caught, transaction.atomic():
+            duplicate.save()
+        self.assertTrue(duplicate.is_duplicate_item_error(caught.exception))
+        # The live MAS itself, or an unrelated failure, is not a duplicate
+        self.assertFalse(original.is_duplicate_item_error(IntegrityError('NOT NULL constraint failed')))
+
+    def test_stale_head_is_rejected(self):
+        original = self.make_mas(self.items[0], status='rejected')
+        original.create_revision(self.new_revision(original), self.vendor)
+        with self.assertRaises(RevisionConflict):
+            original.create_revision(self.new_revision(original), self.vendor)
+        self.assertEqual(MAS.objects.filter(mas_id=original.mas_id).count(), 2)
+
+
+class MASTimelineTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.original = self.make_mas(self.items[0], status='rejected')
+        self.original.log_activity('created', self.vendor, 'Created')
+        self.original.log_activity('rejected', self.reviewer, 'Missing data')
+        self.rev = self.original.create_revision(
+            MAS(project=self.project, building=self.building, service=self.service, item=self.items[0],
+                make='Acme v2', attachment='mas_files/test.pdf', creator=self.vendor),
+            self.vendor,
+        )
+        self.url = reverse('mas_sheets:mas_timeline', args=[self.rev.pk])
+
+    def test_timeline_loads_in_two_queries_and_is_cached(self):
+        self.client.force_login(self.reviewer)
+        # Session, user, MAS, role check, version aggregate, revisions, prefetched logs
+        with self.assertNumQueries(7):
+            data = self.client.get(self.url, {'format': 'json'}).json()
+        self.assertEqual([r['label'] for r in data['revisions']], ['R0', 'R1'])
+        self.assertEqual([e['action'] for e in data['revisions'][0]['events']], ['created', 'rejected'])
+        self.assertEqual([e['action'] for e in data['revisions'][1]['events']], ['revision_submitted'])
+        # Repeated opens only check the chain's last activity
+        with self.assertNumQueries(5):
+            self.client.get(self.url, {'format': 'json'})
+
+    def test_new_activity_invalidates_cache(self):
+        self.client.force_login(self.vendor)
+        self.client.get(self.url)
+        self.rev.log_activity('reviewed', self.reviewer, 'Looks fine')
+        resp = self.client.get(self.url)
+        self.assertContains(resp, 'Looks fine')
+
+    def test_review_and_approve_pages_include_timeline_loader(self):
+        self.client.force_login(self.reviewer)
+        resp = self.client.get(reverse('mas_sheets:review_mas', args=[self.rev.pk]))
+        self.assertTemplateUsed(resp, 'mas_sheets/partials/mas_timeline_js.html')
+        self.rev.status = 'pending_approval'
+        self.rev.save()
+        self.client.force_login(self.approver)
+        resp = self.client.get(reverse('mas_sheets:approve_mas', args=[self.rev.pk]))
+        self.assertTemplateUsed(resp, 'mas_sheets/partials/mas_timeline_js.html')
+
+    def test_timeline_respects_visibility(self):
+        other = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class WorkflowTransactionTests(MASTestMixin, TestCase):
+    def test_review_rolls_back_when_logging_fails(self):
+        mas = self.make_mas(self.items[0])
+        self.client.force_login(self.reviewer)
+        with mock.patch.object(MAS, 'log_activity', side_effect=RuntimeError('log write failed')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('mas_sheets:review_mas', args=[mas.pk]), {'action': 'approve'})
+        mas.refresh_from_db()
+        self.assertEqual(mas.status, 'pending_review')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.mas_open_count, 1)
+
+    def test_buffered_logs_take_one_insert_per_table_and_no_lookups(self):
+        pk = self.make_mas(self.items[0]).pk
+        mas = MAS.objects.select_related('project', 'building', 'service', 'item').get(pk=pk)
+        # One INSERT for the activity logs and one for their events
+        with self.assertNumQueries(2), buffered_activity_logs():
+            mas.log_activity('reviewed', self.reviewer, 'Looked at it')
+            mas.log_activity('submitted_approval', self.reviewer, 'Sent on')
+        logs = MASActivityLog.objects.filter(mas=mas, action__in=['reviewed', 'submitted_approval'])
+        self.assertEqual([(log.project_name, log.item_name, log.username) for log in logs],
+                         [('Tower', self.items[0].name, 'reviewer')] * 2)
+
+    def test_review_commits_status_and_log_together(self):
+        mas = self.make_mas(self.items[0])
+        self.client.force_login(self.reviewer)
+        self.client.post(reverse('mas_sheets:review_mas', args=[mas.pk]), {'action': 'approve'})
+        mas.refresh_from_db()
+        self.assertEqual(mas.status, 'pending_approval')
+        self.assertTrue(MASActivityLog.objects.filter(mas=mas, action='submitted_approval').exists())
+
+
+class ActivityLogArchiveTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        override = override_settings(MAS_LOG_ARCHIVE_DIR=self.archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.mas = self.make_mas(self.items[0])
+        self.old_log = self.mas.log_activity('created', self.vendor, 'Old entry')
+        self.new_log = self.mas.log_activity('edited', self.vendor, 'Recent entry')
+        self.old_time = timezone.now() - timedelta(days=400)
+        MASActivityLog.objects.filter(pk=self.old_log.pk).update(timestamp=self.old_time)
+
+    def test_archive_moves_old_logs_and_history_reads_them_back(self):
+        call_command('archive_mas_logs', '--older-than-days', '90', stdout=StringIO())
+        self.assertEqual(list(MASActivityLog.objects.values_list('pk', flat=True)), [self.new_log.pk])
+        partitions = archive.read_manifest()
+        self.assertEqual([(p['month'], p['rows']) for p in partitions],
+                         [(timezone.localtime(self.old_time).strftime('%Y-%m'), 1)])
+
+        self.client.force_login(self.vendor)
+        url = reverse('mas_sheets:mas_history')
+        details = [log.details for log in self.client.get(url).context['logs']]
+        self.assertEqual(details, ['Recent entry', 'Old entry'])
+
+        # A range that stays after the archive does not open it
+        recent = (timezone.localdate() - timedelta(days=30)).isoformat()
+        with mock.patch.object(archive, '_read_partition') as read_partition:
+            details = [log.details for log in self.client.get(url, {'date_from': recent}).context['logs']]
+        self.assertEqual(details, ['Recent entry'])
+        read_partition.assert_not_called()
+
+        export = self.client.get(reverse('mas_sheets:mas_history_export'))
+        body = b''.join(export.streaming_content).decode()
+        self.assertIn('Recent entry', body)
+        self.assertIn('Old entry', body)
+
+    @mock.patch('mas_sheets.views.MAS_HISTORY_PAGE_SIZE', 1)
+    def test_history_pages_continue_into_the_archive(self):
+        call_command('archive_mas_logs', '--older-than-days', '90', stdout=StringIO())
+        self.client.force_login(self.vendor)
+        url = reverse('mas_sheets:mas_history')
+        first = self.client.get(url).context
+        self.assertEqual([log.details for log in first['logs']], ['Recent entry'])
+        second = self.client.get(url, {'before': first['next_cursor']}).context
+        self.assertEqual([log.details for log in second['logs']], ['Old entry'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_archived_logs_respect_visibility(self):
+        call_command('archive_mas_logs', '--older-than-days', '90', stdout=StringIO())
+        other_vendor = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.client.force_login(other_vendor)
+        self.assertEqual(list(self.client.get(reverse('mas_sheets:mas_history')).context['logs']), [])
+
+    def test_rerun_merges_without_duplicates(self):
+        call_command('archive_mas_logs', '--older-than-days', '90', stdout=StringIO())
+        another = self.mas.log_activity('reviewed', self.reviewer, 'Late arrival')
+        MASActivityLog.objects.filter(pk=another.pk).update(timestamp=self.old_time)
+        call_command('archive_mas_logs', '--older-than-days', '90', stdout=StringIO())
+        self.assertEqual(archive.read_manifest()[0]['rows'], 2)
+
+    def test_interrupted_run_is_finished_by_the_next_one(self):
+        # The partition is written but the run stops before deleting the archived rows
+        with mock.patch('mas_sheets.archive.transaction') as transaction:
+            transaction.atomic.side_effect = RuntimeError
+            with self.assertRaises(RuntimeError):
+                archive.archive_logs(older_than_days=90)
+        self.assertTrue(MASActivityLog.objects.filter(pk=self.old_log.pk).exists())
+
+        self.assertEqual(archive.archive_logs(older_than_days=90), 1)
+        self.assertFalse(MASActivityLog.objects.filter(pk=self.old_log.pk).exists())
+        partition = archive.read_manifest()[0]
+        self.assertEqual(partition['rows'], 1)
+        self.assertEqual([record['id'] for record in archive._read_partition(partition['file'])], [self.old_log.pk])
+
+
+class MASHistoryPaginationTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mas = self.make_mas(self.items[0])
+        now = timezone.now()
+        self.logs = [self.mas.log_activity('edited', self.vendor, f'Edit {i}') for i in range(5)]
+        # Two entries share a timestamp so the id tie-breaker is exercised
+        for i, log in enumerate(self.logs):
+            MASActivityLog.objects.filter(pk=log.pk).update(timestamp=now - timedelta(minutes=min(i, 3)))
+        self.client.force_login(self.vendor)
+        self.url = reverse('mas_sheets:mas_history')
+
+    @mock.patch('mas_sheets.views.MAS_HISTORY_PAGE_SIZE', 2)
+    def test_keyset_pages_cover_every_log_once(self):
+        seen = []
+        params = {}
+        while True:
+            resp = self.client.get(self.url, params)
+            seen += [log.details for log in resp.context['logs']]
+            if not resp.context['next_cursor']:
+                break
+            params = {'before': resp.context['next_cursor']}
+        self.assertEqual(seen, ['Edit 0', 'Edit 1', 'Edit 2', 'Edit 4', 'Edit 3'])
+
+    def test_date_filters_use_aware_ranges(self):
+        MASActivityLog.objects.filter(pk=self.logs[0].pk).update(timestamp=timezone.now() - timedelta(days=3))
+        day = timezone.localdate(timezone.now() - timedelta(days=3)).isoformat()
+        resp = self.client.get(self.url, {'date_from': day, 'date_to': day})
+        self.assertEqual([log.details for log in resp.context['logs']], ['Edit 0'])
+
+    def test_malformed_cursor_shows_first_page(self):
+        resp = self.client.get(self.url, {'before': 'not-a-cursor'})
+        self.assertTrue(resp.context['is_first_page'])
+        self.assertEqual(len(resp.context['logs']), 5)
+
+
+class HistoryFilterOptionsTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        ProjectVendor.objects.get(user=self.vendor).services.add(self.service)
+        self.mas = self.make_mas(self.items[0], make='Acme')
+        self.mas.log_activity('created', self.vendor, 'Created')
+        self.client.force_login(self.vendor)
+        self.url = reverse('mas_sheets:mas_history')
+
+    def test_cached_render_runs_only_the_log_query(self):
+        self.client.get(self.url)
+        # Session, user and the page of logs
+        with self.assertNumQueries(3):
+            resp = self.client.get(self.url)
+        self.assertEqual([item['name'] for item in resp.context['items']], ['Item 0', 'Item 1', 'Item 2'])
+        self.assertNotIn('makes', resp.context)
+
+    def test_options_come_from_assignments(self):
+        self.client.force_login(self.approver)
+        resp = self.client.get(self.url)
+        self.assertEqual([user['username'] for user in resp.context['users']], ['approver', 'reviewer', 'vendor'])
+        self.assertEqual([building['name'] for building in resp.context['buildings']], ['B1'])
+        self.assertEqual([service['name'] for service in resp.context['services']], ['HVAC'])
+
+    def test_catalog_changes_invalidate_options(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.create(service=self.service, name='Item 3')
+        resp = self.client.get(self.url)
+        self.assertEqual([item['name'] for item in resp.context['items']], ['Item 0', 'Item 1', 'Item 2', 'Item 3'])
+
+    def test_mas_writes_keep_options_cached(self):
+        version = options_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            mas = self.make_mas(self.items[1], make='Zenith')
+            mas.log_activity('created', self.vendor, 'Created')
+            mas.reviewer = self.reviewer
+            mas.status = 'pending_approval'
+            mas.save()
+            MAS.objects.get(pk=self.mas.pk).delete()
+        self.assertEqual(options_version(), version)
+
+    def test_lazy_option_endpoints(self):
+        resp = self.client.get(reverse('mas_sheets:mas_history_options', args=['makes']))
+        self.assertEqual(resp.json(), {'options': ['Acme']})
+        other = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.client.force_login(other)
+        resp = self.client.get(reverse('mas_sheets:mas_history_options', args=['makes']))
+        self.assertEqual(resp.json(), {'options': []})
+        self.assertEqual(self.client.get(reverse('mas_sheets:mas_history_options', args=['nope'])).status_code, 404)
+
+
+class FacetCountTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        first = self.make_mas(self.items[0], make='Acme')
+        second = self.make_mas(self.items[1], make='Zenith', status='approved')
+        for mas in (first, second):
+            mas.log_activity('created', self.vendor, 'Created')
+        second.log_activity('approved', self.approver, 'Approved')
+        self.first, self.second = first, second
+        self.client.force_login(self.vendor)
+
+    def test_history_facets_ignore_their_own_filter(self):
+        url = reverse('mas_sheets:mas_history')
+        with self.assertNumQueries(2 + 9):  # session, user, one grouped query per facet
+            facets = self.client.get(url, {'facets': 1, 'make': 'Acme'}).json()['facets']
+        # The make facet counts every make; the others only Acme's logs
+        self.assertEqual(facets['make'], {'Acme': 1, 'Zenith': 2})
+        self.assertEqual(facets['action'], {'created': 1})
+        self.assertEqual(facets['item'], {str(self.items[0].pk): 1})
+        # Cached per filter signature
+        with self.assertNumQueries(2):
+            self.client.get(url, {'facets': 1, 'make': 'Acme'})
+
+    def test_list_facets_follow_status_and_filters(self):
+        url = reverse('mas_sheets:mas_list')
+        facets = self.client.get(url, {'facets': 1, 'status': 'approved'}).json()['facets']
+        self.assertEqual(facets['item'], {str(self.items[1].pk): 1})
+        facets = self.client.get(url, {'facets': 1, 'status': 'pending', 'item': self.items[0].pk}).json()['facets']
+        self.assertEqual(facets['item'], {str(self.items[0].pk): 1})
+        self.assertEqual(facets['vendor'], {str(self.vendor.pk): 1})
+
+
+class MASIdAutocompleteTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mas = [self.make_mas(item) for item in self.items]
+        self.url = reverse('mas_sheets:ajax_autocomplete_mas_id')
+
+    def test_prefix_suggestions_are_scoped_and_limited(self):
+        self.client.force_login(self.vendor)
+        prefix = self.mas[0].mas_id[:-1]
+        resp = self.client.get(self.url, {'q': prefix, 'limit': 2})
+        self.assertEqual(resp.json()['options'], sorted(mas.mas_id for mas in self.mas)[:2])
+        self.assertIn('private', resp['Cache-Control'])
+        self.assertEqual(self.client.get(self.url, {'q': 'X'}).json()['options'], [])
+
+        other = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url, {'q': prefix}).json()['options'], [])
+
+    def test_repeated_prefix_is_served_from_cache(self):
+        self.client.force_login(self.reviewer)
+        self.client.get(self.url, {'q': 'P100'})
+        with self.assertNumQueries(2):  # session and user only
+            resp = self.client.get(self.url, {'q': 'P100'})
+        self.assertEqual(len(resp.json()['options']), 3)
+
+class MASCounterTests(MASTestMixin, TestCase):
+    def counts(self):
+        self.project.refresh_from_db()
+        self.building.refresh_from_db()
+        counts = (self.project.mas_open_count, self.project.mas_approved_count, self.project.mas_rejected_count)
+        self.assertEqual(
+            counts, (self.building.mas_open_count, self.building.mas_approved_count, self.building.mas_rejected_count)
+        )
+        return counts
+
+    def test_counters_follow_status_transitions(self):
+        mas = self.make_mas(self.items[0])
+        self.make_mas(self.items[1], status='approved')
+        self.assertEqual(self.counts(), (1, 1, 0))
+
+        mas = MAS.objects.get(pk=mas.pk)
+        mas.status = 'rejected'
+        mas.save()
+        self.assertEqual(self.counts(), (0, 1, 1))
+
+        revision = MAS(project=self.project, building=self.building, service=self.service, item=mas.item,
+                       make='Acme v2', attachment='mas_files/test.pdf', creator=self.vendor)
+        mas.create_revision(revision, self.vendor)
+        self.assertEqual(self.counts(), (1, 1, 0))
+
+        # Moving between statuses of the same bucket issues no UPDATE
+        with self.assertNumQueries(0):
+            move_mas_counters((self.project.pk, self.building.pk, 'pending_review'),
+                              (self.project.pk, self.building.pk, 'revision_requested'))
+
+        MAS.objects.get(pk=revision.pk).delete()
+        self.assertEqual(self.counts(), (0, 1, 0))
+
+    def test_rebuild_command_repairs_drift(self):
+        self.make_mas(self.items[0])
+        self.make_mas(self.items[1], status='approved')
+        Project.objects.update(mas_open_count=7)
+        Building.objects.update(mas_rejected_count=3)
+        call_command('rebuild_mas_counters', stdout=StringIO())
+        self.assertEqual(self.counts(), (1, 1, 0))
+
+    def test_saving_stale_instance_keeps_counters(self):
+        stale_project = Project.objects.get(pk=self.project.pk)
+        stale_building = Building.objects.get(pk=self.building.pk)
+        self.make_mas(self.items[0])
+        self.make_mas(self.items[1], status='approved')
+
+        stale_project.name = 'Tower East'
+        stale_project.save()
+        stale_building.name = 'B1 East'
+        stale_building.save()
+        self.assertEqual(self.counts(), (1, 1, 0))
+        self.assertEqual((self.project.name, self.building.name), ('Tower East', 'B1 East'))
+
+        # Counters are still written when named explicitly
+        stale_project.mas_open_count = 0
+        stale_project.save(update_fields=['mas_open_count'])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.mas_open_count, 0)
+
+
+class MASSearchTests(MASTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.make_mas(self.items[0], make='Carrier')
+        self.second = self.make_mas(self.items[1], make='Daikin')
+        self.second.review_comment = 'Carrier datasheet missing'
+        self.second.save()
+        other_vendor = User.objects.create_user(username='vendor2', password='pass', user_type='Vendor')
+        self.other = self.make_mas(self.items[0], make='Carrier', creator=other_vendor)
+
+    def found(self, query, **scope):
+        return [pk for pk, score in search_mas(query, **scope)]
+
+    def check_search(self):
+        # Make matches outrank comment matches, and the last token matches as a prefix
+        ranked = self.found('carr')
+        self.assertEqual(set(ranked[:2]), {self.first.pk, self.other.pk})
+        self.assertEqual(ranked[2:], [self.second.pk])
+        self.assertEqual(self.found('carr', creator_id=self.vendor.id), [self.first.pk, self.second.pk])
+        self.assertEqual(self.found(self.first.mas_id)[0], self.first.pk)
+        self.assertEqual(self.found('datasheet carrier'), [self.second.pk])
+        self.assertEqual(self.found('carrier', building_ids=[]), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite-only')
+    def test_fts_index_tracks_saves(self):
+        self.assertTrue(search.fts_enabled())
+        self.check_search()
+        MAS.objects.get(pk=self.other.pk).delete()
+        self.assertEqual(self.found('carrier'), [self.first.pk, self.second.pk])
+
+    def test_inverted_index_fallback(self):
+        with mock.patch.object(search, 'fts_enabled', return_value=False):
+            call_command('rebuild_mas_search', stdout=StringIO())
+            self.check_search()
+
+    def test_superseded_revisions_are_not_found(self):
+        revision = MAS(project=self.project, building=self.building, service=self.service, item=self.items[0],
+                       make='Carrier', attachment='mas_files/test.pdf', creator=self.vendor)
+        self.first.create_revision(revision, self.vendor)
+        self.assertEqual(self.found('carrier', creator_id=self.vendor.id), [revision.pk, self.second.pk])
+        with mock.patch.object(search, 'fts_enabled', return_value=False):
+            call_command('rebuild_mas_search', stdout=StringIO())
+            self.assertEqual(self.found('carrier', creator_id=self.vendor.id), [revision.pk, self.second.pk])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite-only')
+    def test_fts_check_is_redone_after_migrate(self):
+        connection.mas_fts_enabled = False  # As if checked before the FTS table was created
+        self.assertFalse(search.fts_enabled())
+        search.reset_fts_enabled(using=connection.alias)
+        self.assertTrue(search.fts_enabled())
+
+    def test_search_view_scopes_to_vendor(self):
+        self.client.force_login(self.vendor)
+        resp = self.client.get(reverse('mas_sheets:mas_search'), {'q': 'carrier'})
+        self.assertEqual(resp.context['results'], [self.first, self.second])
+
+
+class AuditMASChainsTests(MASTestMixin, TestCase):
+    def audit(self, *args):
+        out = StringIO()
+        call_command('audit_mas_chains', *args, stdout=out)
+        return out.getvalue()
+
+    def test_detects_and_repairs_anomalies(self):
+        original = self.make_mas(self.items[0], status='rejected')
+        rev = original.create_revision(
+            MAS(project=self.project, building=self.building, service=self.service, item=self.items[0],
+                make='Acme v2', attachment='mas_files/test.pdf', creator=self.vendor),
+            self.vendor,
+        )
+        other = self.make_mas(self.items[1])
+
+        # Lose the head, point the revision at another chain and reuse a serial
+        MAS.objects.filter(pk=rev.pk).update(is_latest=False, parent_mas=other)
+        MAS.objects.filter(pk=other.pk).update(serial_number=original.serial_number)
+
+        report = self.audit()
+        self.assertIn('Chains with no latest revision: 1', report)
+        self.assertIn('MAS with orphaned parent_mas: 1', report)
+        self.assertIn('Duplicate project serials: 1', report)
+        self.assertIn('Chains with a stale head pointer: 1', report)
+
+        self.audit('--repair')
+        rev.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(rev.is_latest)
+        self.assertEqual(rev.parent_mas_id, original.pk)
+        self.assertNotEqual(other.serial_number, original.serial_number)
+        self.assertTrue(other.mas_id.endswith(f'-{other.serial_number}'))
+        self.assertEqual(MASChain.objects.get(pk=rev.chain_id).head_id, rev.pk)
+
+        report = self.audit()
+        for line in report.splitlines():
+            self.assertTrue(line.endswith(': 0'), line)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite-specific')
+class IndexUsageTests(MASTestMixin, TestCase):
+    """
+    Guard the hot query paths against losing their indexes. Plans are taken from the
+    querysets the views build (through the same helpers) or from the SQL a view runs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='pass', user_type='Admin')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f'Expected {index_name} in query plan:\n{plan}')
+
+    def assertSearchesOnly(self, queryset):
+        """Scoped queries may start from whichever index narrows them most, but never scan a table"""
+        plan = queryset.explain()
+        self.assertNotIn(' SCAN ', f' {plan}', f'Unexpected table scan in query plan:\n{plan}')
+
+    def assertRunsQueryUsingIndex(self, run, sql_fragment, index_name):
+        """Call `run()` and check that a SELECT it issues containing `sql_fragment` uses `index_name`"""
+        with CaptureQueriesContext(connection) as captured:
+            run()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in captured.captured_queries:
+                if query['sql'].startswith('SELECT') and sql_fragment in query['sql']:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    plans.append('\n'.join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans, f'No query containing {sql_fragment!r} was run')
+        self.assertTrue(any(index_name in plan for plan in plans),
+                        f'Expected {index_name} in a query plan:\n' + '\n---\n'.join(plans))
+
+    def mas_list_page(self, user, status):
+        """The page query mas_list runs for `user` on the `status` tab"""
+        mas_list = views._mas_list_scope(user, status)[0]
+        return views._apply_mas_list_filters(mas_list, {'status': status})[:views.MAS_LIST_PAGE_SIZE]
+
+    def test_mas_list_queries(self):
+        self.assertUsesIndex(self.mas_list_page(self.reviewer, 'pending'), 'mas_latest_bldg_status_idx')
+        self.assertUsesIndex(self.mas_list_page(self.vendor, 'approved'), 'mas_latest_creator_status_idx')
+        self.assertUsesIndex(self.mas_list_page(self.admin, 'all'), 'mas_latest_updated_idx')
+
+    def test_load_items_blocked_query(self):
+        self.client.force_login(self.vendor)
+        url = reverse('mas_sheets:ajax_load_items')
+        self.assertRunsQueryUsingIndex(
+            lambda: self.client.get(url, {'service': self.service.pk, 'project': self.project.pk}),
+            'FROM "mas_sheets_mas"', 'unique_latest_mas_per_vendor_item',
+        )
+
+    def test_chain_and_serial_queries(self):
+        mas = self.make_mas(self.items[0])
+        self.assertUsesIndex(mas.get_revision_history(), 'mas_chain_revision_idx')
+        other = Project.objects.create(name='Annex', project_number='P200')
+        self.assertRunsQueryUsingIndex(
+            lambda: MASSerialCounter.reserve(other.pk), 'MAX("mas_sheets_mas"."serial_number")',
+            'mas_project_serial_idx',
+        )
+
+    def test_mas_history_queries(self):
+        visible = views._visible_history_logs(self.admin)[0]
+        page = views.MAS_HISTORY_PAGE_SIZE + 1
+        logs = views._apply_history_filters(visible, {})
+        self.assertUsesIndex(logs[:page], 'maslog_timestamp_id_idx')
+        self.assertUsesIndex(views._history_before(logs, (timezone.now(), 10))[:page], 'maslog_timestamp_id_idx')
+        # Date filters stay ranges on the same index
+        day = timezone.localdate().isoformat()
+        dated = views._apply_history_filters(visible, {'date_from': day, 'date_to': day})
+        self.assertUsesIndex(dated[:page], 'maslog_timestamp_id_idx')
+        # Team members' pages start from their buildings instead
+        team_logs = views._apply_history_filters(views._visible_history_logs(self.reviewer)[0], {})
+        self.assertSearchesOnly(team_logs[:page])
+
+    def test_timeline_queries(self):
+        mas = self.make_mas(self.items[0])
+        mas.log_activity('created', self.vendor, 'Created')
+        self.client.force_login(self.vendor)
+        url = reverse('mas_sheets:mas_timeline', args=[mas.pk])
+        self.assertRunsQueryUsingIndex(
+            lambda: self.client.get(url), 'FROM "mas_sheets_masactivitylog"', 'maslog_mas_timestamp_idx',
+        )
+
+    def test_mas_id_autocomplete_query(self):
+        queryset = _mas_id_suggestion_queryset(self.admin, 'P100')[:MAS_ID_SUGGESTIONS_LIMIT]
+        self.assertUsesIndex(queryset, 'mas_masid_latest_idx')
+        self.assertSearchesOnly(_mas_id_suggestion_queryset(self.vendor, 'P100')[:MAS_ID_SUGGESTIONS_LIMIT])
+
+    def test_analytics_queries(self):
+        self.client.force_login(self.admin)
+        self.assertRunsQueryUsingIndex(
+            lambda: self.client.get(reverse('accounts:analytics')), '"approval_date" >=', 'mas_status_approval_idx',
+        )
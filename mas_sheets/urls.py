@@ -5,15 +5,23 @@ app_name = 'mas_sheets'
 
 urlpatterns = [
     path('create/', views.mas_create, name='mas_create'),
+    path('create/batch/', views.mas_batch_create, name='mas_batch_create'),
     path('edit/<int:pk>/', views.mas_edit, name='mas_edit'),
     path('list/', views.mas_list, name='mas_list'),
+    path('list/views/save/', views.mas_list_view_save, name='mas_list_view_save'),
+    path('list/views/<int:pk>/delete/', views.mas_list_view_delete, name='mas_list_view_delete'),
     path('history/', views.mas_history, name='mas_history'),
+    path('history/export/', views.mas_history_export, name='mas_history_export'),
+    path('history/options/<slug:name>/', views.mas_history_options, name='mas_history_options'),
+    path('search/', views.mas_search, name='mas_search'),
     path('review/<int:pk>/', views.review_mas, name='review_mas'),
     path('approve/<int:pk>/', views.approve_mas, name='approve_mas'),
     path('revision/<int:pk>/', views.mas_revision, name='mas_revision'),
+    path('timeline/<int:pk>/', views.mas_timeline, name='mas_timeline'),
     # AJAX URLs
     path('ajax/load-buildings/', views.load_buildings, name='ajax_load_buildings'),
     path('ajax/load-services/', views.load_services, name='ajax_load_services'),
     path('ajax/load-items/', views.load_items, name='ajax_load_items'),
     path('ajax/load-makes/', views.load_makes, name='ajax_load_makes'),
+    path('ajax/autocomplete-mas-id/', views.autocomplete_mas_id, name='ajax_autocomplete_mas_id'),
 ]
\ No newline at end of file
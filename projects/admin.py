@@ -108,13 +108,13 @@ class ProjectVendorInline(admin.StackedInline):
 
 class ProjectAdmin(admin.ModelAdmin):
     inlines = [BuildingInline, ProjectTeamMemberInline, ProjectVendorInline]
-    list_display = ['name', 'project_number', 'owner', 'created_at']
+    list_display = ['name', 'project_number', 'owner', 'mas_open_count', 'mas_approved_count', 'mas_rejected_count', 'created_at']
     search_fields = ['name', 'project_number']
     ordering = ['-created_at']
 
 class BuildingAdmin(admin.ModelAdmin):
     inlines = [BuildingRoleInline]
-    list_display = ['name', 'project', 'get_reviewers', 'get_approvers']
+    list_display = ['name', 'project', 'mas_open_count', 'mas_approved_count', 'mas_rejected_count', 'get_reviewers', 'get_approvers']
     list_filter = ['project']
     search_fields = ['name', 'project__name']
     
@@ -5,29 +5,14 @@ from django.contrib.auth import get_user_model
 class ProjectForm(forms.ModelForm):
     class Meta:
         model = Project
-        fields = ['name', 'project_number']
-
-    def clean_name(self):
-        name = self.cleaned_data.get('name')
-        if Project.objects.filter(name__iexact=name).exists():
-            raise forms.ValidationError('A project with this name already exists.')
-        return name
+        fields = ['name', 'project_number', 'mas_fast_track']
+        # Case-insensitive name uniqueness is validated by the unique_project_name_ci constraint
 
 class BuildingForm(forms.ModelForm):
     class Meta:
         model = Building
         fields = ['project', 'name']
-
-    def clean(self):
-        cleaned_data = super().clean()
-        project = cleaned_data.get('project')
-        name = cleaned_data.get('name')
-
-        if project and name:
-            if Building.objects.filter(project=project, name__iexact=name).exists():
-                raise forms.ValidationError('This building name already exists in the project.')
-
-        return cleaned_data
+        # Case-insensitive name uniqueness per project is validated by the unique_building_name_ci constraint
 
 class ProjectTeamMemberForm(forms.ModelForm):
     from .models import BuildingRole
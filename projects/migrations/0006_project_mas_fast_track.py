@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0005_buildingrole"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="mas_fast_track",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("", "Off"),
+                    ("skip_review", "Skip review (send straight to approver)"),
+                    ("auto_approve", "Auto-approve"),
+                ],
+                default="",
+                help_text="How to route a new MAS for an item/make already approved in this project",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:45
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_project_mas_fast_track"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="building",
+            constraint=models.UniqueConstraint(
+                models.F("project"),
+                django.db.models.functions.text.Lower("name"),
+                name="unique_building_name_ci",
+                violation_error_message="This building name already exists in the project.",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="project",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="unique_project_name_ci",
+                violation_error_message="A project with this name already exists.",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0007_case_insensitive_names"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="building",
+            name="mas_approved_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="building",
+            name="mas_open_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="building",
+            name="mas_rejected_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="mas_approved_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="mas_open_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="mas_rejected_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,25 +1,80 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 from services.models import Service
 
-class Project(models.Model):
+# Kept current by mas_sheets with F() updates of the rows themselves
+MAS_COUNTER_FIELDS = {'mas_open_count', 'mas_approved_count', 'mas_rejected_count'}
+
+class MASCountersMixin:
+    """
+    Leaves the MAS counters out of saves of existing rows unless `update_fields` names
+    them, so saving an instance loaded before a status change cannot write stale counts.
+    """
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in MAS_COUNTER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+class Project(MASCountersMixin, models.Model):
+    FAST_TRACK_CHOICES = [
+        ('', 'Off'),
+        ('skip_review', 'Skip review (send straight to approver)'),
+        ('auto_approve', 'Auto-approve'),
+    ]
+
     name = models.CharField(max_length=200, unique=True)
     project_number = models.CharField(max_length=100, unique=True)
     owner = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True, related_name='owned_projects')
+    # Fast-track rule for new MAS whose item/make was already approved in this project
+    mas_fast_track = models.CharField(max_length=20, choices=FAST_TRACK_CHOICES, blank=True, default='',
+                                      help_text='How to route a new MAS for an item/make already approved in this project')
+    # Latest-revision MAS counts, maintained by mas_sheets on every status change
+    mas_open_count = models.IntegerField(default=0, editable=False)
+    mas_approved_count = models.IntegerField(default=0, editable=False)
+    mas_rejected_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # Project names are unique regardless of case
+            models.UniqueConstraint(
+                Lower('name'),
+                name='unique_project_name_ci',
+                violation_error_message='A project with this name already exists.',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.project_number})"
 
-class Building(models.Model):
+class Building(MASCountersMixin, models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='buildings')
     name = models.CharField(max_length=200)
+    # Latest-revision MAS counts, maintained by mas_sheets on every status change
+    mas_open_count = models.IntegerField(default=0, editable=False)
+    mas_approved_count = models.IntegerField(default=0, editable=False)
+    mas_rejected_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['project', 'name']
+        constraints = [
+            # Building names are unique within a project regardless of case
+            models.UniqueConstraint(
+                models.F('project'),
+                Lower('name'),
+                name='unique_building_name_ci',
+                violation_error_message='This building name already exists in the project.',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.project}"
@@ -1,7 +1,8 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Project, ProjectTeamMember, ProjectVendor
+from .forms import BuildingForm, ProjectForm
+from .models import Building, Project, ProjectTeamMember, ProjectVendor
 
 User = get_user_model()
 
@@ -69,3 +70,18 @@ class DeletePermissionsTests(TestCase):
         self.client.force_login(self.other)
         resp = self.client.post(reverse('vendor_delete', kwargs={'project_pk': self.project.pk, 'vendor_pk': self.vendor.pk}))
         self.assertEqual(resp.status_code, 403)
+
+
+class CaseInsensitiveNameTests(TestCase):
+    def test_project_name_unique_ignoring_case(self):
+        Project.objects.create(name='Tower', project_number='P1')
+        form = ProjectForm(data={'name': 'TOWER', 'project_number': 'P2', 'mas_fast_track': ''})
+        self.assertFalse(form.is_valid())
+        self.assertIn('A project with this name already exists.', str(form.errors))
+
+    def test_building_name_unique_within_project_ignoring_case(self):
+        project = Project.objects.create(name='Tower', project_number='P1')
+        Building.objects.create(project=project, name='Block A')
+        form = BuildingForm(data={'project': project.pk, 'name': 'block a'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('This building name already exists in the project.', str(form.errors))
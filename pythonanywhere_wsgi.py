@@ -10,6 +10,9 @@ if path not in sys.path:
 
 # Set environment variables
 os.environ['DJANGO_SETTINGS_MODULE'] = 'mas.settings'
+# Cache shared by all worker processes, kept outside the project directory
+os.environ['MAS_CACHE_BACKEND'] = 'django.core.cache.backends.filebased.FileBasedCache'
+os.environ['MAS_CACHE_LOCATION'] = '/home/askajitk/.cache/mas'
 
 # Activate virtual environment
 virtualenv_path = '/home/askajitk/.virtualenvs/mas_env'
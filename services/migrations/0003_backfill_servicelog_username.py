@@ -1,15 +1,24 @@
 from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+from mas.backfill import backfill_update, print_progress
 
 
 def backfill_usernames(apps, schema_editor):
     ServiceLog = apps.get_model('services', 'ServiceLog')
-    # For existing logs with a user FK and empty snapshot, copy the username
-    for log in ServiceLog.objects.filter(username__isnull=True, user__isnull=False).select_related('user'):
-        log.username = log.user.username
-        log.save(update_fields=['username'])
+    User = ServiceLog._meta.get_field('user').related_model
+    # For existing logs with a user FK and empty snapshot, copy the username:
+    # one UPDATE per pk range, and a re-run resumes where it stopped
+    backfill_update(
+        ServiceLog.objects.filter(username__isnull=True, user__isnull=False),
+        username=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('username')[:1]),
+        progress=print_progress('ServiceLog.username'),
+    )
 
 
 class Migration(migrations.Migration):
+    # Commit each backfill chunk separately
+    atomic = False
 
     dependencies = [
         ("services", "0002_servicelog_username"),
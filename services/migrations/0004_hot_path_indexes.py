@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0003_backfill_servicelog_username"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="servicelog",
+            index=models.Index(fields=["-timestamp"], name="servicelog_timestamp_idx"),
+        ),
+    ]
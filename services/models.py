@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from events.models import Event, SERVICE_LOG_CODES
 
 class Service(models.Model):
     SERVICE_CHOICES = [
@@ -53,5 +54,24 @@ class ServiceLog(models.Model):
     details = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp'], name='servicelog_timestamp_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Every new log entry is also appended to the event store
+        with transaction.atomic():
+            is_new = self._state.adding
+            super().save(*args, **kwargs)
+            if is_new:
+                Event.objects.create(
+                    code=SERVICE_LOG_CODES[(self.content_type, self.action)],
+                    timestamp=self.timestamp,
+                    actor_id=self.user_id,
+                    subject_id=self.object_id,
+                    payload={'username': self.username, 'details': self.details},
+                )
+
     def __str__(self):
         return f"{self.action} by {self.user} at {self.timestamp}"
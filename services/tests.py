@@ -1,3 +1,13 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from .models import ServiceLog
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite-specific')
+class ServiceLogIndexTests(TestCase):
+    def test_service_log_listing_uses_timestamp_index(self):
+        plan = ServiceLog.objects.all().order_by('-timestamp').explain()
+        self.assertIn('servicelog_timestamp_idx', plan)
 
-# Create your tests here.